@@ -0,0 +1,88 @@
+"""
+Shared helpers for turning Pydantic-AI class methods into Marvin Tools.
+
+Every agent under `agentic/*_agent/` subclasses `MarvinAgentBase`, wraps one Pydantic-AI
+class and exposes the methods marked with `@agent_tool` as tools. The logic lives here so
+each agent module only has to declare which class it wraps.
+"""
+
+import inspect
+import logging
+from functools import lru_cache, partial
+from types import FunctionType, MethodType
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple
+
+from marvin.beta.applications import Agent
+from marvin.tools import Tool
+
+from .pydantic_ai.tooling import TOOL_MARKER
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_shared_instance(cls: type) -> Any:
+    """
+    Returns the process-wide instance of a Pydantic-AI class, constructing it on first use.
+    Instances hold boto3 clients, so agents share one rather than building their own.
+    """
+    return cls()
+
+@lru_cache(maxsize=512)
+def _tool_description(func: FunctionType) -> str:
+    """
+    Cleaned docstring used as a tool description, cached per underlying function
+    so every agent wrapping the same method reuses it.
+    """
+    return inspect.getdoc(func) or f"Tool for {func.__name__} functionality."
+
+@lru_cache(maxsize=None)
+def _tool_specs_for(cls: type) -> Tuple[Tuple[str, Callable[..., Tool], FunctionType], ...]:
+    """
+    Returns a (name, tool factory, function) triple for every `@agent_tool` method of a
+    Pydantic-AI class. The factory is `Tool` with name and description pre-bound, so
+    building a tool per instance only has to supply the bound method.
+    Tools are declared on the class, so this runs once per class.
+    """
+    # Walk the MRO base-first so overrides in subclasses win
+    tool_functions: Dict[str, FunctionType] = {}
+    for klass in reversed(cls.__mro__):
+        for name, func in vars(klass).items():
+            # Only plain functions can be bound with MethodType; no bound-method objects are created here
+            if isinstance(func, FunctionType) and getattr(func, TOOL_MARKER, False):
+                tool_functions[name] = func
+
+    return tuple(
+        (name, partial(Tool, name=name, description=_tool_description(func)), func)
+        for name, func in tool_functions.items()
+    )
+
+# Generate tools for a Pydantic-AI class instance from its `@agent_tool` methods
+def generate_agent_tools(pydantic_ai_instance: object) -> List[Tool]:
+    tools: List[Tool] = []
+    cls = type(pydantic_ai_instance)
+    # Local aliases skip the global/attribute lookups inside the loop
+    append, bind = tools.append, MethodType
+    for name, make_tool, func in _tool_specs_for(cls):
+        try:
+            # Marvin Tools expect a Callable; bind the cached function to this instance
+            append(make_tool(func=bind(func, pydantic_ai_instance)))
+        except Exception as e:
+            logger.warning("Failed to create tool for method %s: %s", name, e)
+    logger.info("Loaded %d tools from %s: %s", len(tools), cls.__name__, [tool.name for tool in tools])
+    return tools
+
+class MarvinAgentBase(Agent):
+    """
+    Base for agents that expose a single Pydantic-AI class as Marvin Tools.
+    Subclasses only set `pydantic_ai_cls`.
+    """
+    pydantic_ai_cls: ClassVar[Optional[type]] = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Reuse the shared Pydantic-AI instance
+        self.pydantic_ai_instance = get_shared_instance(self.pydantic_ai_cls)
+        # `tools` is a field of the Marvin model, so it is assigned here rather than shadowed by a
+        # property; building the list only binds the tool specs cached per class
+        self.tools = generate_agent_tools(self.pydantic_ai_instance)
@@ -7,32 +7,52 @@ This module is intended to be scanned by the LocalSentinels framework for agent
 Each sub-folder represents a distinct agent with its own agent.py entrypoint and skills.
 """
 
+import importlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from marvin.beta.applications import Agent
-from marvin.tools import Tool
-from typing import List, Type
+from typing import Tuple, Type
 
-# Import individual agents
-from .background_remover_agent.agent import BackgroundRemoverAgent
-from .image_analysis_agent.agent import ImageAnalysisAgent
-from .image_processor_agent.agent import ImageProcessorAgent
-from .mistral_pixtral_analyzer_agent.agent import MistralPixtralAnalyzerAgent
-from .rekognition_analyzer_agent.agent import RekognitionAnalyzerAgent
-from .ai_extractor_agent.agent import AIExtractorAgent
-from .product_grouper_agent.agent import ProductGrouperAgent
+from ._tool_factory import get_shared_instance
 
 
-# List of all agents to be registered
+# List of all agents to be registered, as (module path, class name) pairs.
+# Agent modules are only imported when an agent is requested via get_agent(),
+# so callers that need a single agent don't pay for loading all of them.
 # LocalSentinels or another discovery mechanism would import this list
 # or dynamically scan the directory structure.
-ALL_BG_REMOVER_AGENTS: List[Type[Agent]] = [
-    BackgroundRemoverAgent,
-    ImageAnalysisAgent,
-    ImageProcessorAgent,
-    MistralPixtralAnalyzerAgent,
-    RekognitionAnalyzerAgent,
-    AIExtractorAgent,
-    ProductGrouperAgent,
-]
+ALL_BG_REMOVER_AGENTS: Tuple[Tuple[str, str], ...] = (
+    ('.background_remover_agent.agent', 'BackgroundRemoverAgent'),
+    ('.image_analysis_agent.agent', 'ImageAnalysisAgent'),
+    ('.image_processor_agent.agent', 'ImageProcessorAgent'),
+    ('.mistral_pixtral_analyzer_agent.agent', 'MistralPixtralAnalyzerAgent'),
+    ('.rekognition_analyzer_agent.agent', 'RekognitionAnalyzerAgent'),
+    ('.ai_extractor_agent.agent', 'AIExtractorAgent'),
+    ('.product_grouper_agent.agent', 'ProductGrouperAgent'),
+)
+
+_AGENT_MODULES = {class_name: module_path for module_path, class_name in ALL_BG_REMOVER_AGENTS}
+
+def get_agent(class_name: str) -> Type[Agent]:
+    """
+    Imports the agent's module on first use and returns the agent class.
+    """
+    module = importlib.import_module(_AGENT_MODULES[class_name], package=__package__)
+    return getattr(module, class_name)
+
+def warm_up_bg_remover_agents():
+    """
+    Builds every agent's shared Pydantic-AI instance (and the boto3 clients it holds) in parallel
+    at bootstrap, so the first request does not pay for client construction.
+    A failure is reported but does not stop the remaining agents from warming up.
+    """
+    pydantic_ai_classes = {get_agent(class_name).pydantic_ai_cls for _, class_name in ALL_BG_REMOVER_AGENTS}
+    with ThreadPoolExecutor(max_workers=len(pydantic_ai_classes)) as executor:
+        futures = {executor.submit(get_shared_instance, cls): cls for cls in pydantic_ai_classes}
+        for future in as_completed(futures):
+            error = future.exception()
+            if error:
+                print(f"  - Warm-up failed for {futures[future].__name__}: {error}")
 
 def register_bg_remover_agents():
     """
@@ -40,11 +60,13 @@ def register_bg_remover_agents():
     (Placeholder implementation)
     """
     print("Attempting to register BG-Remover agents with LocalSentinels...")
-    for agent_class in ALL_BG_REMOVER_AGENTS:
+    for _, class_name in ALL_BG_REMOVER_AGENTS:
+        agent_class = get_agent(class_name)
         # In a real scenario, this would involve calling a LocalSentinels SDK method
         # or sending a registration request.
         print(f"  - Registering agent: {agent_class.__name__}")
         # LocalSentinels.register_agent(agent_class) # Example API call
+    warm_up_bg_remover_agents()
     print("BG-Remover agent registration process initiated.")
 
 if __name__ == "__main__":
@@ -1,8 +1,12 @@
 import re
-from typing import List, Optional, Dict, Any, Set, Literal
+from functools import lru_cache
+from itertools import islice
+from typing import List, Optional, Dict, Any, FrozenSet, Tuple
 
 from pydantic import BaseModel, Field
 
+from .tooling import agent_tool
+
 # Import from previously created Pydantic-AI modules
 from .mistral_pixtral_analyzer import MistralPixtralAnalysisResult
 from .image_analysis import BilingualProductDescription as MultilingualProductDescription, ProductDescription
@@ -55,7 +59,7 @@ class ExtractionResult(BaseModel):
 
 # --- Constants and Regex Patterns ---
 
-KNOWN_BRANDS: Set[str] = set([
+KNOWN_BRANDS: FrozenSet[str] = frozenset([
   'abercrombie', 'adidas', 'armani', 'balenciaga', 'burberry', 'calvin klein',
   'cartier', 'chanel', 'coach', 'dior', 'dolce & gabbana', 'fendi', 'gap',
   'gucci', 'h&m', 'hermès', 'hugo boss', 'lacoste', 'levi', 'louis vuitton',
@@ -64,21 +68,78 @@ KNOWN_BRANDS: Set[str] = set([
   'cos', 'mango', 'massimo dutti', 'pull & bear', 'bershka', 'stradivarius',
 ])
 
-MATERIAL_PATTERNS = re.compile(r'\b(cotton|linen|polyester|leather|silk|wool|cashmere|denim|suede|velvet|satin|chiffon|nylon|spandex|elastane|viscose|rayon|acrylic|fleece|corduroy|tweed|knit|jersey)\b', re.IGNORECASE)
-COLOR_PATTERNS = re.compile(r'\b(light|dark|pale|bright|deep)?\s?(gray|grey|white|black|blue|red|green|yellow|purple|brown|beige|navy|maroon|olive|teal|pink|orange|cream|tan|khaki|burgundy|charcoal|ivory|gold|silver|bronze|copper|turquoise|lavender|mint|coral|peach|rose|crimson|indigo|violet|magenta|cyan|lime|rust|mustard|emerald|sapphire|ruby)\b', re.IGNORECASE)
-PATTERN_KEYWORDS = re.compile(r'\b(striped?|solid|floral|polka dot|checkered|plaid|geometric|paisley|animal print|zebra|leopard|houndstooth|argyle|chevron|abstract|tie-dye|camouflage)\b', re.IGNORECASE)
-STYLE_ADJECTIVES = re.compile(r'\b(casual|formal|elegant|sporty|relaxed|fitted|oversized|slim|classic|modern|vintage|bohemian|minimalist|preppy|edgy|sophisticated|chic|trendy|business|athletic)\b', re.IGNORECASE)
-SEASONAL_KEYWORDS = re.compile(r'\b(summer|winter|spring|fall|autumn|all-season)\b', re.IGNORECASE)
-SUSTAINABILITY_KEYWORDS = re.compile(r'\b(sustainable|eco-friendly|organic|recycled|fair trade|ethically sourced|biodegradable|renewable|vegan|cruelty-free)\b', re.IGNORECASE)
-CARE_INSTRUCTION_PATTERNS = re.compile(r'\b(machine wash cold|machine wash warm|hand wash only|dry clean only|do not dry clean|tumble dry low|tumble dry medium|do not tumble dry|line dry|lay flat to dry|hang to dry|iron on low heat|iron on medium heat|do not iron|steam only|cool iron if needed|do not bleach|non-chlorine bleach only|bleach when needed|professional dry clean|dry flat|reshape while damp)\b', re.IGNORECASE)
-
-CONDITION_EXCELLENT = re.compile(r'\b(new with tags|brand new|never worn|mint condition|pristine|unworn|nwt|bnwt|tags attached)\b', re.IGNORECASE)
-CONDITION_VERY_GOOD = re.compile(r'\b(like new|excellent condition|barely worn|hardly used|minimal wear|near mint|almost new|worn once)\b', re.IGNORECASE)
-CONDITION_GOOD = re.compile(r'\b(good condition|gently used|light wear|some signs of use|lightly worn|normal wear)\b', re.IGNORECASE)
-CONDITION_FAIR = re.compile(r'\b(used|wear and tear|visible signs|needs repair|stains|fading|pilling|minor damage)\b', re.IGNORECASE)
-CONDITION_POOR = re.compile(r'\b(damaged|broken|heavily worn|for parts|restoration needed|major damage|torn|ripped)\b', re.IGNORECASE)
-
-STOP_WORDS: Set[str] = set([
+# Brand names and titles are tokenized the same way, so "levi's" yields "levi" and "h&m" stays whole
+BRAND_TOKEN_PATTERN = re.compile(r'[\w&]+')
+
+# Terminal key of the brand trie; no title token can equal it, unlike a marker string
+_END = object()
+
+def _build_brand_trie(brands: FrozenSet[str]) -> Dict[Any, Any]:
+    """
+    Nested dicts keyed on brand tokens; a terminal node stores the brand under _END.
+    """
+    trie: Dict[Any, Any] = {}
+    for brand in brands:
+        node = trie
+        for token in BRAND_TOKEN_PATTERN.findall(brand):
+            node = node.setdefault(token, {})
+        node[_END] = brand
+    return trie
+
+BRAND_TRIE = _build_brand_trie(KNOWN_BRANDS)
+
+# Attribute vocabularies. They are compiled together into ATTRIBUTE_PATTERNS below so the
+# text is scanned once for all of them; each alternative is a named group per attribute.
+# Like every pattern below, it is matched against lowercased text and needs no IGNORECASE.
+ATTRIBUTE_VOCABULARIES: Tuple[Tuple[str, str], ...] = (
+    ('material', r'cotton|linen|polyester|leather|silk|wool|cashmere|denim|suede|velvet|satin|chiffon|nylon|spandex|elastane|viscose|rayon|acrylic|fleece|corduroy|tweed|knit|jersey'),
+    ('color', r'(?P<color_shade>light|dark|pale|bright|deep)?\s?(?P<color_name>gray|grey|white|black|blue|red|green|yellow|purple|brown|beige|navy|maroon|olive|teal|pink|orange|cream|tan|khaki|burgundy|charcoal|ivory|gold|silver|bronze|copper|turquoise|lavender|mint|coral|peach|rose|crimson|indigo|violet|magenta|cyan|lime|rust|mustard|emerald|sapphire|ruby)'),
+    ('pattern', r'striped?|solid|floral|polka dot|checkered|plaid|geometric|paisley|animal print|zebra|leopard|houndstooth|argyle|chevron|abstract|tie-dye|camouflage'),
+    ('style', r'casual|formal|elegant|sporty|relaxed|fitted|oversized|slim|classic|modern|vintage|bohemian|minimalist|preppy|edgy|sophisticated|chic|trendy|business|athletic'),
+    ('season', r'summer|winter|spring|fall|autumn|all-season'),
+    ('sustainability', r'sustainable|eco-friendly|organic|recycled|fair trade|ethically sourced|biodegradable|renewable|vegan|cruelty-free'),
+    ('care', r'machine wash cold|machine wash warm|hand wash only|dry clean only|do not dry clean|tumble dry low|tumble dry medium|do not tumble dry|line dry|lay flat to dry|hang to dry|iron on low heat|iron on medium heat|do not iron|steam only|cool iron if needed|do not bleach|non-chlorine bleach only|bleach when needed|professional dry clean|dry flat|reshape while damp'),
+)
+ATTRIBUTE_PATTERNS = re.compile(
+    r'\b(?:' + '|'.join(f'(?P<{name}>{body})' for name, body in ATTRIBUTE_VOCABULARIES) + r')\b'
+)
+
+# Percentage compositions such as "100% cotton"
+PCT_MATERIAL = re.compile(r'(\d+)%\s*([a-z]+)')
+
+class _WordCharTable(dict):
+    """
+    str.translate table mapping every non-word character (anything but \\w) to a space.
+    Entries are filled in per code point on first sight, so it covers any script.
+    """
+    def __missing__(self, codepoint: int) -> int:
+        char = chr(codepoint)
+        self[codepoint] = mapped = codepoint if char.isalnum() or char == '_' else 32
+        return mapped
+
+# Keyword tokenizer: text.translate(WORD_CHAR_TABLE).split() yields the same words as \b\w+\b
+WORD_CHAR_TABLE = _WordCharTable()
+
+# Condition tiers as (group name, rating, confidence, phrases), highest priority first.
+# All tiers are compiled into one pattern; the alternation sits inside a lookahead so matches
+# may overlap, and a lower-tier phrase (e.g. "used") never hides a higher-tier one ("hardly used").
+CONDITION_TIERS: Tuple[Tuple[str, int, float, str], ...] = (
+    ('excellent', 5, 0.95, r'new with tags|brand new|never worn|mint condition|pristine|unworn|nwt|bnwt|tags attached'),
+    ('very_good', 4, 0.90, r'like new|excellent condition|barely worn|hardly used|minimal wear|near mint|almost new|worn once'),
+    ('good', 3, 0.85, r'good condition|gently used|light wear|some signs of use|lightly worn|normal wear'),
+    ('fair', 2, 0.80, r'used|wear and tear|visible signs|needs repair|stains|fading|pilling|minor damage'),
+    ('poor', 1, 0.85, r'damaged|broken|heavily worn|for parts|restoration needed|major damage|torn|ripped'),
+)
+CONDITION_PATTERNS = re.compile(
+    r'\b(?=' + '|'.join(f'(?P<{name}>{phrases})\\b' for name, _, _, phrases in CONDITION_TIERS) + r')'
+)
+# Group name -> (priority, rating, confidence)
+CONDITION_RATINGS: Dict[str, Tuple[int, int, float]] = {
+    name: (priority, rating, confidence)
+    for priority, (name, rating, confidence, _) in enumerate(CONDITION_TIERS)
+}
+
+STOP_WORDS: FrozenSet[str] = frozenset([
   'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
   'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
   'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
@@ -141,15 +202,18 @@ ICELANDIC_TRANSLATIONS: Dict[str, str] = {
   'Dry flat': 'Þurrka flatt', 'Reshape while damp': 'Móta á meðan rakt',
 }
 
+# Lowercased keys, so lookups do not depend on how the English value was capitalized
+_IS_LOWER: Dict[str, str] = {english.lower(): icelandic for english, icelandic in ICELANDIC_TRANSLATIONS.items()}
+
 
 CATEGORY_MAP: Dict[str, Dict[str, str]] = {
   # Clothing
-  'blouse': {'primary': 'Clothing', 'secondary': 'Women's Clothing', 'tertiary': 'Tops'},
-  'shirt': {'primary': 'Clothing', 'secondary': 'Men's Clothing', 'tertiary': 'Tops'},
-  'dress': {'primary': 'Clothing', 'secondary': 'Women's Clothing', 'tertiary': 'Dresses'},
+  'blouse': {'primary': 'Clothing', 'secondary': "Women's Clothing", 'tertiary': 'Tops'},
+  'shirt': {'primary': 'Clothing', 'secondary': "Men's Clothing", 'tertiary': 'Tops'},
+  'dress': {'primary': 'Clothing', 'secondary': "Women's Clothing", 'tertiary': 'Dresses'},
   'pants': {'primary': 'Clothing', 'secondary': 'Bottoms', 'tertiary': 'Pants'},
   'jeans': {'primary': 'Clothing', 'secondary': 'Bottoms', 'tertiary': 'Jeans'},
-  'skirt': {'primary': 'Clothing', 'secondary': 'Women's Clothing', 'tertiary': 'Skirts'},
+  'skirt': {'primary': 'Clothing', 'secondary': "Women's Clothing", 'tertiary': 'Skirts'},
   'jacket': {'primary': 'Clothing', 'secondary': 'Outerwear', 'tertiary': 'Jackets'},
   'coat': {'primary': 'Clothing', 'secondary': 'Outerwear', 'tertiary': 'Coats'},
   'sweater': {'primary': 'Clothing', 'secondary': 'Tops', 'tertiary': 'Sweaters'},
@@ -170,6 +234,19 @@ CATEGORY_MAP: Dict[str, Dict[str, str]] = {
 }
 
 
+# All category keywords in one pattern, longest first so 't-shirt' wins over 'shirt' at the same position
+CATEGORY_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in sorted(CATEGORY_MAP, key=len, reverse=True)))
+
+
+# Confidence reported for attributes taken from an AI analysis instead of the regex extractors
+AI_OVERRIDE_CONFIDENCE = 0.90
+
+# Called with the closed vocabulary of the patterns above, so results are memoized
+@lru_cache(maxsize=512)
+def _capitalize_first_letter(text: str) -> str:
+    return text.split(' ')[0].capitalize() + ' ' + ' '.join(text.split(' ')[1:]) if ' ' in text else text.capitalize()
+
+
 class AIAttributeExtractor:
     """
     Extracts structured product attributes from AI-generated descriptions or
@@ -178,20 +255,28 @@ class AIAttributeExtractor:
 
     def __init__(self, use_ai_extraction: bool = False):
         self.use_ai_extraction = use_ai_extraction
+        # Regex extraction is deterministic, so repeated listings of the same product reuse the result
+        self._extract_with_regex_cached = lru_cache(maxsize=4096)(self._extract_with_regex)
 
-    def _capitalize_first_letter(self, text: str) -> str:
-        return text.split(' ')[0].capitalize() + ' '.join(text.split(' ')[1:]) if ' ' in text else text.capitalize()
+    def _extract_brand(self, title: str, title_lower: str, override: Optional[str] = None) -> Dict[str, Any]:
+        if override:
+            return {'brand': override, 'confidence': AI_OVERRIDE_CONFIDENCE}
 
-    def _extract_brand(self, title: str, description: str) -> Dict[str, Any]:
-        title_lower = title.lower()
-        
         first_word = title_lower.split()[0] if title_lower else ""
         if first_word in KNOWN_BRANDS:
             return {'brand': title.split()[0], 'confidence': 0.95} # Preserve original casing
 
-        for brand in KNOWN_BRANDS:
-            if brand in title_lower:
-                return {'brand': self._capitalize_first_letter(brand), 'confidence': 0.90} # Capitalize brand name
+        # Walk the brand trie from each token, keeping the longest brand starting there
+        tokens = BRAND_TOKEN_PATTERN.findall(title_lower)
+        for start in range(len(tokens)):
+            node, brand = BRAND_TRIE, None
+            for token in tokens[start:]:
+                node = node.get(token)
+                if node is None:
+                    break
+                brand = node.get(_END, brand)
+            if brand:
+                return {'brand': _capitalize_first_letter(brand), 'confidence': 0.90} # Capitalize brand name
 
         capitalized_match = re.search(r'\b([A-Z][a-z]+(?:\s[A-Z][a-z]+)?)\b', title)
         if capitalized_match:
@@ -199,75 +284,72 @@ class AIAttributeExtractor:
 
         return {'brand': None, 'confidence': 0.50}
 
-    def _extract_material(self, text: str) -> Dict[str, Any]:
-        matches = MATERIAL_PATTERNS.findall(text)
+    def _scan_attributes(self, text: str) -> Dict[str, List[re.Match]]:
+        """
+        Scans the text once with ATTRIBUTE_PATTERNS and buckets the matches by attribute.
+        """
+        found: Dict[str, List[re.Match]] = {name: [] for name, _ in ATTRIBUTE_VOCABULARIES}
+        for match in ATTRIBUTE_PATTERNS.finditer(text):
+            found[match.lastgroup].append(match)
+        return found
+
+    def _extract_material(self, matches: List[re.Match], text: str, override: Optional[str] = None) -> Dict[str, Any]:
+        if override:
+            return {'material': override, 'confidence': AI_OVERRIDE_CONFIDENCE}
         if matches:
-            material = matches[0].lower()
-            percentage_pattern = re.compile(r'(\d+)%\s*' + re.escape(material), re.IGNORECASE)
-            if percentage_pattern.search(text):
-                return {'material': self._capitalize_first_letter(material), 'confidence': 0.95}
-            return {'material': self._capitalize_first_letter(material), 'confidence': 0.90}
+            material = matches[0].group(0)
+            if any(m.group(2) == material for m in PCT_MATERIAL.finditer(text)):
+                return {'material': _capitalize_first_letter(material), 'confidence': 0.95}
+            return {'material': _capitalize_first_letter(material), 'confidence': 0.90}
         return {'material': None, 'confidence': 0.50}
 
-    def _extract_colors(self, text: str) -> Dict[str, Any]:
-        matches = COLOR_PATTERNS.findall(text)
+    def _extract_colors(self, matches: List[re.Match], override: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        if override:
+            return {'colors': list(override), 'confidence': AI_OVERRIDE_CONFIDENCE}
         if matches:
-            color_set = set()
-            for match_tuple in matches:
-                full_match = ' '.join(filter(None, match_tuple)).strip() # Reconstruct multi-word color
-                color_set.add(self._capitalize_first_letter(full_match))
+            # Reconstruct multi-word colors from the shade and color groups
+            color_set = {_capitalize_first_letter(' '.join(filter(None, match.group('color_shade', 'color_name')))) for match in matches}
             return {'colors': list(color_set), 'confidence': 0.85}
         return {'colors': [], 'confidence': 0.50}
 
-    def _extract_pattern(self, title: str, description: str) -> Dict[str, Any]:
-        title_match = PATTERN_KEYWORDS.search(title)
-        if title_match:
-            return {'pattern': self._capitalize_first_letter(title_match.group(0)), 'confidence': 0.95}
-
-        desc_match = PATTERN_KEYWORDS.search(description)
-        if desc_match:
-            return {'pattern': self._capitalize_first_letter(desc_match.group(0)), 'confidence': 0.85}
+    def _extract_pattern(self, matches: List[re.Match], title_length: int, override: Optional[str] = None) -> Dict[str, Any]:
+        if override:
+            return {'pattern': override, 'confidence': AI_OVERRIDE_CONFIDENCE}
+        # The text starts with the title, so a first match ending within it is a title match
+        if matches:
+            first_match = matches[0]
+            confidence = 0.95 if first_match.end() <= title_length else 0.85
+            return {'pattern': _capitalize_first_letter(first_match.group(0)), 'confidence': confidence}
         return {'pattern': None, 'confidence': 0.50}
 
-    def _extract_care_instructions(self, text: str) -> Dict[str, Any]:
-        matches = CARE_INSTRUCTION_PATTERNS.findall(text)
+    def _extract_care_instructions(self, matches: List[re.Match], override: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        if override:
+            return {'careInstructions': list(override), 'confidence': AI_OVERRIDE_CONFIDENCE}
         if matches:
-            instruction_set = set()
-            for match_str in matches:
-                instruction_set.add(self._capitalize_first_letter(match_str))
+            instruction_set = {_capitalize_first_letter(match.group(0)) for match in matches}
             return {'careInstructions': list(instruction_set), 'confidence': 0.90}
         return {'careInstructions': [], 'confidence': 0.50}
 
     def _extract_condition_rating(self, text: str) -> Dict[str, Any]:
-        if CONDITION_EXCELLENT.search(text):
-            return {'conditionRating': 5, 'confidence': 0.95}
-        if CONDITION_VERY_GOOD.search(text):
-            return {'conditionRating': 4, 'confidence': 0.90}
-        if CONDITION_GOOD.search(text):
-            return {'conditionRating': 3, 'confidence': 0.85}
-        if CONDITION_FAIR.search(text):
-            return {'conditionRating': 2, 'confidence': 0.80}
-        if CONDITION_POOR.search(text):
-            return {'conditionRating': 1, 'confidence': 0.85}
+        # Single scan over all tiers, keeping the highest-priority tier seen
+        best: Optional[Tuple[int, int, float]] = None
+        for match in CONDITION_PATTERNS.finditer(text):
+            tier = CONDITION_RATINGS[match.lastgroup]
+            if best is None or tier < best:
+                best = tier
+                if best[0] == 0:
+                    break
+        if best:
+            return {'conditionRating': best[1], 'confidence': best[2]}
         return {'conditionRating': 3, 'confidence': 0.50} # Default
 
-    def _extract_style_and_sustainability(self, text: str) -> Dict[str, Any]:
-        style_matches = STYLE_ADJECTIVES.findall(text)
-        seasonal_matches = SEASONAL_KEYWORDS.findall(text)
-        sustainability_matches = SUSTAINABILITY_KEYWORDS.findall(text)
-
-        style: List[str] = []
-
-        if style_matches:
-            style.extend([self._capitalize_first_letter(s) for s in style_matches])
-
-        if seasonal_matches:
-            style.extend([self._capitalize_first_letter(s) for s in seasonal_matches])
-
-        unique_style = list(set(style))
-
-        sustainability = [self._capitalize_first_letter(s) for s in sustainability_matches]
-        unique_sustainability = list(set(sustainability))
+    def _extract_style_and_sustainability(self, scan: Dict[str, List[re.Match]], style_override: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        # Styles and seasons are both reported as style
+        if style_override:
+            unique_style = list(style_override)
+        else:
+            unique_style = list({_capitalize_first_letter(m.group(0)) for m in scan['style'] + scan['season']})
+        unique_sustainability = list({_capitalize_first_letter(m.group(0)) for m in scan['sustainability']})
 
         confidence = 0.85 if unique_style or unique_sustainability else 0.50
 
@@ -286,37 +368,31 @@ class AIAttributeExtractor:
         if params.get('sustainability'):
             for tag in params['sustainability']: keywords.add(tag.lower())
 
-        words = re.findall(r'\b\w+\b', params['description'].lower())
-        for word in words:
-            if len(word) > 3 and word not in STOP_WORDS:
-                keywords.add(word)
-
-        title_words = re.findall(r'\b\w+\b', params['title'].lower())
-        for word in title_words:
-            if len(word) > 3 and word not in STOP_WORDS:
-                keywords.add(word)
+        # The description is the full text, which already starts with the title
+        words = params['description'].translate(WORD_CHAR_TABLE).split()
+        keywords.update({word for word in words if len(word) > 3} - STOP_WORDS)
 
-        keyword_array = list(keywords)[:20]
+        keyword_array = list(islice(keywords, 20))
 
         return {'keywords': keyword_array, 'confidence': 0.85 if keyword_array else 0.50}
 
     def _extract_category(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        title_lower = params['title'].lower()
-        description_lower = params['description'].lower()
-
-        for keyword, category_info in CATEGORY_MAP.items():
-            if keyword in title_lower or keyword in description_lower:
+        # A keyword in the title is the stronger signal, so the title is scanned first
+        for text, confidence in ((params['title'], 0.90), (params['description'], 0.80)):
+            keyword_match = CATEGORY_PATTERN.search(text)
+            if keyword_match:
+                category_info = CATEGORY_MAP[keyword_match.group(0)]
                 return {
-                    'category': CategoryPath(
+                    'category': CategoryPath.model_construct(
                         primary=category_info['primary'],
                         secondary=category_info['secondary'],
                         tertiary=category_info['tertiary'],
                         path=f"{category_info['primary']} > {category_info['secondary']} > {category_info['tertiary']}"
                     ),
-                    'confidence': 0.90 if keyword in title_lower else 0.80
+                    'confidence': confidence
                 }
         return {
-            'category': CategoryPath(
+            'category': CategoryPath.model_construct(
                 primary='General', secondary='Miscellaneous', tertiary='Uncategorized',
                 path='General > Miscellaneous > Uncategorized'
             ),
@@ -324,27 +400,27 @@ class AIAttributeExtractor:
         }
 
     def _translate_to_icelandic_dict_based(self, result: ExtractionResult) -> IcelandicTranslations:
-        translations = IcelandicTranslations()
+        translations = IcelandicTranslations.model_construct()
 
         if result.material:
-            translations.material = ICELANDIC_TRANSLATIONS.get(result.material, result.material)
+            translations.material = _IS_LOWER.get(result.material.lower(), result.material)
 
         if result.colors:
             translated_colors = []
             for color in result.colors:
                 words = color.split(' ')
-                translated_words = [ICELANDIC_TRANSLATIONS.get(word, word) for word in words]
+                translated_words = [_IS_LOWER.get(word.lower(), word) for word in words]
                 translated_colors.append(' '.join(translated_words))
             translations.colors = translated_colors
 
         if result.pattern:
-            translations.pattern = ICELANDIC_TRANSLATIONS.get(result.pattern, result.pattern)
+            translations.pattern = _IS_LOWER.get(result.pattern.lower(), result.pattern)
 
         if result.style:
-            translations.style = [ICELANDIC_TRANSLATIONS.get(s, s) for s in result.style]
+            translations.style = [_IS_LOWER.get(s.lower(), s) for s in result.style]
 
         if result.careInstructions:
-            translations.careInstructions = [ICELANDIC_TRANSLATIONS.get(c, c) for c in result.careInstructions]
+            translations.careInstructions = [_IS_LOWER.get(c.lower(), c) for c in result.careInstructions]
         
         return translations
 
@@ -385,17 +461,7 @@ class AIAttributeExtractor:
             conditionRating=mistral_result.aiConfidence.condition if mistral_result.aiConfidence else 0.85
         )
 
-        icelandic_translations_dict_based = self._translate_to_icelandic_dict_based(ExtractionResult(
-            brand=mistral_result.brand,
-            material=mistral_result.material,
-            colors=mistral_result.colors,
-            pattern=mistral_result.pattern,
-            style=mistral_result.style,
-            careInstructions=mistral_result.careInstructions
-        ))
-
-
-        return ExtractionResult(
+        result = ExtractionResult(
             brand=mistral_result.brand,
             material=mistral_result.material,
             colors=mistral_result.colors,
@@ -412,43 +478,47 @@ class AIAttributeExtractor:
             careInstructions=mistral_result.careInstructions,
             conditionRating=condition_rating,
             aiConfidence=ai_confidence,
-            translations={
-                "is": icelandic_translations_dict_based
-            }
         )
+        # Translate from the result itself instead of building a second model for it
+        result.translations = {"is": self._translate_to_icelandic_dict_based(result)}
+        return result
 
 
-    def extract_attributes(
+    def _extract_with_regex(
         self,
-        product_name: str = Field(..., description="The name of the product."),
-        bilingual_description: ProductDescription = Field(..., description="Product description in English."), # Only English part is used for regex extraction
-        mistral_result: Optional[MistralPixtralAnalysisResult] = Field(None, description="Optional AI analysis result from Mistral Pixtral for AI-native extraction.")
+        title: str,
+        short_en: str,
+        description_en: str,
+        brand: Optional[str] = None,
+        material: Optional[str] = None,
+        colors: Optional[Tuple[str, ...]] = None,
+        pattern: Optional[str] = None,
+        style: Optional[Tuple[str, ...]] = None,
+        care_instructions: Optional[Tuple[str, ...]] = None
     ) -> ExtractionResult:
         """
-        Extracts structured product attributes from AI-generated descriptions or
-        uses regex-based extraction as a fallback.
+        Regex-based extraction over the product title and English description.
+        Attributes passed in (e.g. from an AI analysis) are used as-is instead of being extracted.
+        Sequences are tuples so the arguments stay hashable for the result cache.
         """
-        if self.use_ai_extraction and mistral_result:
-            # Need to pass an empty MultilingualProductDescription as placeholder if only English is used
-            return self._extract_from_ai(mistral_result, product_name, MultilingualProductDescription(en=bilingual_description, is_=ProductDescription(short="", long="", category="", colors=[], condition="good", keywords=[])))
+        # Lowercase once; every pattern matches lowercase text, and only the brand
+        # extractor still needs the original title for casing
+        title_lower = title.lower()
+        full_text = f"{title_lower} {short_en.lower()} {description_en.lower()}"
 
-        en_desc = bilingual_description
-        description_en = en_desc.long
-        short_en = en_desc.short
-        title = product_name
-
-        full_text = f"{title} {short_en} {description_en}"
-
-        brand_res = self._extract_brand(title, full_text)
-        material_res = self._extract_material(full_text)
-        colors_res = self._extract_colors(full_text)
-        pattern_res = self._extract_pattern(title, full_text)
-        style_sustain_res = self._extract_style_and_sustainability(full_text)
-        care_instructions_res = self._extract_care_instructions(full_text)
+        # One pass collects material, color, pattern, style, season, sustainability and care matches
+        scan = self._scan_attributes(full_text)
+
+        brand_res = self._extract_brand(title, title_lower, override=brand)
+        material_res = self._extract_material(scan['material'], full_text, override=material)
+        colors_res = self._extract_colors(scan['color'], override=colors)
+        pattern_res = self._extract_pattern(scan['pattern'], len(title_lower), override=pattern)
+        style_sustain_res = self._extract_style_and_sustainability(scan, style_override=style)
+        care_instructions_res = self._extract_care_instructions(scan['care'], override=care_instructions)
         condition_rating_res = self._extract_condition_rating(full_text)
         
         keywords_res = self._extract_keywords({
-            'title': title,
+            'title': title_lower,
             'description': full_text,
             'brand': brand_res['brand'],
             'material': material_res['material'],
@@ -459,14 +529,14 @@ class AIAttributeExtractor:
         })
 
         category_res = self._extract_category({
-            'title': title,
+            'title': title_lower,
             'description': full_text,
             'material': material_res['material'],
             'pattern': pattern_res['pattern'],
             'style': style_sustain_res['style'],
         })
 
-        ai_confidence = AIConfidence(
+        ai_confidence = AIConfidence.model_construct(
             brand=brand_res['confidence'],
             material=material_res['confidence'],
             colors=colors_res['confidence'],
@@ -478,7 +548,8 @@ class AIAttributeExtractor:
             conditionRating=condition_rating_res['confidence'],
         )
 
-        base_result = ExtractionResult(
+        # Every value above comes from our own patterns and tables, so validation is skipped
+        base_result = ExtractionResult.model_construct(
             brand=brand_res['brand'],
             material=material_res['material'],
             colors=colors_res['colors'],
@@ -492,9 +563,35 @@ class AIAttributeExtractor:
             aiConfidence=ai_confidence,
         )
 
-        icelandic_translations = self._translate_to_icelandic_dict_based(base_result)
+        base_result.translations = {"is": self._translate_to_icelandic_dict_based(base_result)}
+        return base_result
 
-        return ExtractionResult(
-            **base_result.model_dump(),
-            translations={"is": icelandic_translations}
-        )
+    @agent_tool
+    def extract_attributes(
+        self,
+        product_name: str = Field(..., description="The name of the product."),
+        bilingual_description: ProductDescription = Field(..., description="Product description in English."), # Only English part is used for regex extraction
+        mistral_result: Optional[MistralPixtralAnalysisResult] = Field(None, description="Optional AI analysis result from Mistral Pixtral for AI-native extraction.")
+    ) -> ExtractionResult:
+        """
+        Extracts structured product attributes from AI-generated descriptions or
+        uses regex-based extraction as a fallback.
+        """
+        if self.use_ai_extraction and mistral_result:
+            # Need to pass an empty MultilingualProductDescription as placeholder if only English is used
+            return self._extract_from_ai(mistral_result, product_name, MultilingualProductDescription(en=bilingual_description, is_=ProductDescription(short="", long="", category="", colors=[], condition="good", keywords=[])))
+
+        en_desc = bilingual_description
+        overrides: Dict[str, Any] = {}
+        if mistral_result:
+            # Attributes the AI analysis already filled in skip their regex extractors
+            overrides = {
+                'brand': mistral_result.brand,
+                'material': mistral_result.material,
+                'colors': tuple(mistral_result.colors or ()),
+                'pattern': mistral_result.pattern,
+                'style': tuple(mistral_result.style or ()),
+                'care_instructions': tuple(mistral_result.careInstructions or ()),
+            }
+        # Hand out a copy so callers cannot mutate the lists held by the cached result
+        return self._extract_with_regex_cached(product_name, en_desc.short, en_desc.long, **overrides).model_copy(deep=True)
@@ -0,0 +1,36 @@
+"""
+Shared boto3 clients for the Pydantic-AI classes.
+
+boto3 clients are thread-safe, so one client per (service, region) is built with a pooled,
+keep-alive configuration and reused by every instance instead of each creating its own.
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+CLIENT_CONFIG = Config(
+    max_pool_connections=64,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    tcp_keepalive=True,
+)
+
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(service_name: str, region_name: Optional[str] = None) -> Any:
+    """
+    Returns the shared client for a service and region, creating it on first use.
+    Creation is serialized because the default boto3 session is not thread-safe.
+    """
+    key = (service_name, region_name)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = boto3.client(service_name, region_name=region_name, config=CLIENT_CONFIG)
+    return client
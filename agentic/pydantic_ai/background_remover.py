@@ -1,11 +1,15 @@
-import base64
-import json
+import asyncio
+import re
 import time
-from typing import Literal, Optional
+from functools import lru_cache
+from typing import List, Literal, Optional, Tuple
 
-import boto3
 from pydantic import BaseModel, Field, ValidationError
 
+from .aws_clients import get_client
+from .fast_json import dumps, loads
+from .tooling import agent_tool
+
 class RemoveBackgroundOptions(BaseModel):
     """Options for background removal."""
     quality: Literal["standard", "premium"] = Field("premium", description="Quality of the background removal.")
@@ -18,13 +22,59 @@ class RemoveBackgroundResult(BaseModel):
     processing_time_ms: int = Field(..., description="Time taken for processing in milliseconds.")
     metadata: dict = Field(..., description="Metadata about the processed image (width, height, format).")
 
+_IMAGE_PLACEHOLDER = "__IMAGE__"
+
+# Standard base64 alphabet with optional padding; anything else could break out of the JSON string
+_BASE64_RE = re.compile(r'[A-Za-z0-9+/]*={0,2}')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def _base64_slot(base64_image: str) -> bytes:
+    """
+    Returns the image as bytes that are safe to splice into the request template.
+    Line-wrapped base64 is unwrapped; any other character is rejected.
+    """
+    if not _BASE64_RE.fullmatch(base64_image):
+        base64_image = _WHITESPACE_RE.sub('', base64_image)
+        if not _BASE64_RE.fullmatch(base64_image):
+            raise ValueError('base64_image is not valid base64')
+    if len(base64_image) % 4:
+        raise ValueError('base64_image is not valid base64: length is not a multiple of 4')
+    return base64_image.encode('ascii')
+
+@lru_cache(maxsize=32)
+def _body_template(quality: str, height: int, width: int) -> Tuple[bytes, bytes]:
+    """
+    Serializes the Nova Canvas request once per option set and returns the bytes before and
+    after the image slot. Base64 needs no JSON escaping, so the image checked by _base64_slot
+    is spliced in as-is.
+    """
+    body = {
+        "taskType": "BACKGROUND_REMOVAL",
+        "backgroundRemovalParams": {
+            "image": _IMAGE_PLACEHOLDER
+        },
+        "imageGenerationConfig": {
+            "numberOfImages": 1,
+            "quality": quality,
+            "height": height,
+            "width": width
+        }
+    }
+    prefix, suffix = dumps(body).split(_IMAGE_PLACEHOLDER.encode('utf-8'))
+    return prefix, suffix
+
 class BedrockBackgroundRemover:
     """
     Agent for removing background from images using Amazon Nova Canvas on AWS Bedrock.
     """
     def __init__(self, region_name: str = 'us-east-1'):
-        self.bedrock_client = boto3.client('bedrock-runtime', region_name=region_name)
+        self.bedrock_client = get_client('bedrock-runtime', region_name)
+        # Serialize the body template for the default options up front so the first call skips it.
+        # Endpoint and credentials are already resolved when botocore creates the client.
+        defaults = RemoveBackgroundOptions()
+        _body_template(defaults.quality, defaults.height, defaults.width)
 
+    @agent_tool
     def remove_background(
         self,
         base64_image: str = Field(..., description="Base64 encoded input image."),
@@ -34,39 +84,31 @@ class BedrockBackgroundRemover:
         Remove background from a base64 encoded image using Amazon Nova Canvas.
 
         Args:
-            base64_image: The base64 encoded string of the input image.
+            base64_image: The base64 encoded string of the input image. Line breaks are allowed.
             options: Optional settings for quality, height, and width.
 
         Returns:
             A RemoveBackgroundResult object containing the output image buffer (base64 encoded),
             processing time, and metadata.
+
+        Raises:
+            ValueError: If base64_image is not valid base64.
         """
         start_time = time.time() * 1000
 
         if options is None:
             options = RemoveBackgroundOptions()
 
-        body = {
-            "taskType": "BACKGROUND_REMOVAL",
-            "backgroundRemovalParams": {
-                "image": base64_image
-            },
-            "imageGenerationConfig": {
-                "numberOfImages": 1,
-                "quality": options.quality,
-                "height": options.height,
-                "width": options.width
-            }
-        }
+        prefix, suffix = _body_template(options.quality, options.height, options.width)
 
         response = self.bedrock_client.invoke_model(
             modelId='amazon.nova-canvas-v1:0',
             contentType='application/json',
             accept='application/json',
-            body=json.dumps(body)
+            body=prefix + _base64_slot(base64_image) + suffix
         )
 
-        result = json.loads(response['body'].read().decode('utf-8'))
+        result = loads(response['body'].read())
 
         if not result.get('images') or len(result['images']) == 0:
             raise ValueError('Nova Canvas failed to return a processed image')
@@ -87,3 +129,36 @@ class BedrockBackgroundRemover:
             processing_time_ms=processing_time_ms,
             metadata=metadata
         )
+
+    @agent_tool
+    async def remove_background_batch(
+        self,
+        base64_images: List[str] = Field(..., description="Base64 encoded input images."),
+        options: Optional[RemoveBackgroundOptions] = None,
+        concurrency: int = 8
+    ) -> List[RemoveBackgroundResult]:
+        """
+        Remove backgrounds from several base64 encoded images concurrently using Amazon Nova Canvas.
+
+        Args:
+            base64_images: The base64 encoded strings of the input images.
+            options: Optional settings for quality, height, and width, applied to every image.
+            concurrency: Maximum number of Nova Canvas calls in flight at once (default 8).
+
+        Returns:
+            A list of RemoveBackgroundResult objects in the same order as the input images.
+
+        Raises:
+            ValueError: If concurrency is less than 1.
+        """
+        # A zero-slot semaphore would never let a call through, hanging the batch
+        if concurrency < 1:
+            raise ValueError(f'concurrency must be at least 1, got {concurrency}')
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def remove_one(base64_image: str) -> RemoveBackgroundResult:
+            async with semaphore:
+                # The shared client is thread-safe, so the blocking call runs in a worker thread
+                return await asyncio.to_thread(self.remove_background, base64_image, options)
+
+        return await asyncio.gather(*(remove_one(base64_image) for base64_image in base64_images))
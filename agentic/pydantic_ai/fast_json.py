@@ -0,0 +1,25 @@
+"""
+JSON serialization for request and response bodies on hot paths.
+
+Uses orjson when it is installed and falls back to the standard library otherwise.
+Both variants produce compact UTF-8 bytes from dumps() and accept bytes or str in loads(),
+which is what boto3 bodies want, so callers never encode or decode around them.
+"""
+
+import json
+from typing import Any, Callable, Union
+
+dumps: Callable[[Any], bytes]
+loads: Callable[[Union[bytes, bytearray, str]], Any]
+
+try:
+    import orjson
+
+    dumps = orjson.dumps
+    loads = orjson.loads
+except ImportError:
+    def dumps(obj: Any) -> bytes:
+        # Same output shape as orjson: compact separators, non-ASCII kept as UTF-8
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    loads = json.loads
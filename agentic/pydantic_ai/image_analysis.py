@@ -3,9 +3,11 @@ import re
 import time
 from typing import Literal, Optional, List, Dict, Any, get_args
 
-import boto3
 from pydantic import BaseModel, Field, ValidationError
 
+from .aws_clients import get_client
+from .tooling import agent_tool
+
 # --- Data Models ---
 
 class ImageMetadata(BaseModel):
@@ -47,8 +49,8 @@ class BedrockImageAnalyzer:
     def __init__(self,
                  vision_region: str = 'us-east-1',
                  translation_region: str = 'eu-west-1'):
-        self.vision_client = boto3.client('bedrock-runtime', region_name=vision_region)
-        self.translation_client = boto3.client('bedrock-runtime', region_name=translation_region)
+        self.vision_client = get_client('bedrock-runtime', vision_region)
+        self.translation_client = get_client('bedrock-runtime', translation_region)
         self.default_vision_model_id = 'us.mistral.pixtral-large-2502-v1:0'
         self.default_translation_model_id = 'openai.gpt-oss-120b-1:0'
 
@@ -87,6 +89,7 @@ class BedrockImageAnalyzer:
         )
         return json.loads(response['body'].read().decode('utf-8'))
 
+    @agent_tool
     def analyze_image_for_description(
         self,
         image_buffer_b64: str = Field(..., description="Base64 encoded input image buffer."),
@@ -185,6 +188,7 @@ Format your response as JSON with keys: short, long, category, colors, condition
             keywords=keywords
         )
 
+    @agent_tool
     def translate_to_icelandic(
         self,
         description: ProductDescription = Field(..., description="Product description to translate.")
@@ -251,6 +255,7 @@ Provide the response in the same JSON format with keys: short, long, category, c
             print(f"Translation failed, returning original: {e}")
             return description
 
+    @agent_tool
     def generate_bilingual_description(
         self,
         image_buffer_b64: str = Field(..., description="Base64 encoded input image buffer."),
@@ -1,12 +1,32 @@
-import base64
-import json
+import asyncio
+import hashlib
 import re
+import threading
 import time
-from typing import Literal, Optional, List, Dict, Any, get_args
+from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import FrozenSet, Literal, Optional, List, Dict, Any, Tuple
 
-import boto3
 import requests
-from pydantic import BaseModel, Field, ValidationError
+from requests.adapters import HTTPAdapter
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+try:
+    # SIMD base64 with the same API as the stdlib module
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+try:
+    from PIL import Image
+except ImportError:
+    # Without Pillow the vision model receives the full-size image
+    Image = None
+
+from .aws_clients import get_client
+from .fast_json import dumps, loads
+from .tooling import agent_tool
 
 # Assuming these are available or will be created as Pydantic-AI agents
 # from .image_analysis import BedrockImageAnalyzer, ProductDescription, BilingualProductDescription
@@ -24,6 +44,9 @@ class ProductDescription(BaseModel):
     stylingTip: Optional[str] = None
 
 class BilingualProductDescription(BaseModel):
+    # `is` is a keyword, so the field is built in code as is_ and read from JSON as "is"
+    model_config = ConfigDict(populate_by_name=True)
+
     en: ProductDescription
     is_: ProductDescription = Field(..., alias="is")
 
@@ -45,12 +68,155 @@ class ImageProcessingOptions(BaseModel):
 class ProcessImageResult(BaseModel):
     """Result of image processing."""
     output_buffer_b64: Optional[str] = Field(None, description="Base64 encoded output image buffer (e.g., after background removal).")
-    metadata: Dict[str, Any] = Field({}, description="Metadata about the processed image.")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Metadata about the processed image.")
     product_description: Optional[ProductDescription] = Field(None, description="Generated product description.")
     bilingual_description: Optional[BilingualProductDescription] = Field(None, description="Generated bilingual product description.")
     background_removal_result: Optional[RemoveBackgroundResult] = None
 
 
+# Number of generated descriptions kept per processor
+DESCRIPTION_CACHE_SIZE = 1024
+# Longest side of the image sent to the vision model; descriptions do not need more detail
+VISION_MAX_SIDE = 768
+# Images described per vision model call in batch processing
+VISION_BATCH_SIZE = 4
+# Read size when streaming image downloads
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _downscale_for_vision(base64_image: str) -> Tuple[str, str]:
+    """
+    Shrinks the image to fit VISION_MAX_SIDE and re-encodes it as JPEG, cutting upload size
+    and vision tokens. Returns the image unchanged (as PNG) when it is already small enough,
+    cannot be read, or Pillow is not installed.
+    """
+    if Image is None:
+        return base64_image, 'image/png'
+    try:
+        image = Image.open(BytesIO(base64.b64decode(base64_image)))
+        if max(image.size) <= VISION_MAX_SIDE:
+            return base64_image, 'image/png'
+        image.thumbnail((VISION_MAX_SIDE, VISION_MAX_SIDE), Image.Resampling.LANCZOS)
+        if image.mode != 'RGB':
+            # JPEG has no alpha channel; flatten transparency onto white
+            image = image.convert('RGBA')
+            flattened = Image.new('RGB', image.size, 'white')
+            flattened.paste(image, mask=image.getchannel('A'))
+            image = flattened
+        buffer = BytesIO()
+        image.save(buffer, format='JPEG', quality=85)
+        return base64.b64encode(buffer.getvalue()).decode('ascii'), 'image/jpeg'
+    except Exception as e:
+        print(f"Downscaling for vision failed, sending the original image: {e}")
+        return base64_image, 'image/png'
+
+# Outermost {...} / [...] span in free-form model output
+_JSON_OBJ_RE = re.compile(r'\{[\s\S]*\}')
+_JSON_ARRAY_RE = re.compile(r'\[[\s\S]*\]')
+
+
+def _parse_model_json(text: str, span_pattern: re.Pattern = _JSON_OBJ_RE) -> Any:
+    """
+    Parses the JSON in a model response. Models usually answer with bare or code-fenced
+    JSON, which parses directly; otherwise the outermost span matching span_pattern is used.
+    """
+    try:
+        return loads(text.strip().removeprefix('```json').removesuffix('```').strip())
+    except ValueError:
+        json_match = span_pattern.search(text)
+        if not json_match:
+            raise
+        return loads(json_match.group(0))
+
+
+DESCRIPTION_INSTRUCTIONS = """Instructions:
+1. Provide a specific 'Elegant Name' (e.g., 'Tailored Silk Blouse' instead of just 'Shirt').
+2. Write a 3-sentence 'Marketing Description' that sounds timeless, sophisticated, and sustainable.
+3. Identify the product category (clothing, accessories, etc.).
+4. List main colors.
+5. Provide a product condition assessment (choose from: new_with_tags, like_new, very_good, good, fair).
+6. Suggest relevant SEO keywords.
+7. Include a 'Styling Tip'."""
+
+
+def _image_block(base64_image: str, media_type: str) -> Dict[str, Any]:
+    """Vision model content block carrying a base64 image."""
+    return {
+        "type": "image",
+        "source": {
+            "type": "base64",
+            "media_type": media_type,
+            "data": base64_image
+        }
+    }
+
+
+TRANSLATION_TOOL_NAME = 'record_translation'
+# Converse tool whose input schema is the translated description
+TRANSLATION_TOOL_CONFIG: Dict[str, Any] = {
+    "tools": [{
+        "toolSpec": {
+            "name": TRANSLATION_TOOL_NAME,
+            "description": "Records the Icelandic translation of a product description.",
+            "inputSchema": {"json": {
+                "type": "object",
+                "properties": {
+                    "short": {"type": "string"},
+                    "long": {"type": "string"},
+                    "category": {"type": "string"},
+                    "colors": {"type": "array", "items": {"type": "string"}},
+                    "condition": {"type": "string"},
+                    "keywords": {"type": "array", "items": {"type": "string"}},
+                    "stylingTip": {"type": "string"},
+                },
+                "required": ["short", "long"],
+            }},
+        }
+    }],
+    "toolChoice": {"tool": {"name": TRANSLATION_TOOL_NAME}},
+}
+
+_VALID_CONDITIONS: FrozenSet[str] = frozenset({"new_with_tags", "like_new", "very_good", "good", "fair"})
+
+
+def _as_list(value: Any, default: List[str]) -> List[str]:
+    """List field from model JSON: lists pass through, comma-separated strings are split."""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str) and value:
+        return [item.strip() for item in value.split(',')]
+    return default
+
+
+def _description_from_json(parsed_json: Dict[str, Any], product_name: Optional[str]) -> ProductDescription:
+    """Builds a ProductDescription from the vision model's JSON, filling in defaults."""
+    # Simplified condition validation
+    condition = parsed_json.get('condition')
+    if condition not in _VALID_CONDITIONS:
+        condition = 'very_good'
+
+    # The JSON is model output, so the description is validated: a null or non-string field raises
+    # ValidationError, which callers report as a failed description
+    return ProductDescription(
+        short=parsed_json.get('short', product_name or 'Product'),
+        long=parsed_json.get('long', 'High-quality product processed and optimized for sale.'),
+        category=parsed_json.get('category', 'General'),
+        colors=_as_list(parsed_json.get('colors'), ['various']),
+        condition=condition,
+        keywords=_as_list(parsed_json.get('keywords'), ['product']),
+        stylingTip=parsed_json.get('stylingTip')
+    )
+
+
+def _description_cache_key(base64_image: str, product_name: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    return hashlib.blake2b(base64_image.encode('ascii'), digest_size=16).digest(), product_name
+
+
+async def _resolved(value: Any) -> Any:
+    """Awaitable standing in for a processing step that is switched off."""
+    return value
+
+
 class BedrockImageProcessor:
     """
     Agent for processing images, including background removal and description generation,
@@ -58,19 +224,31 @@ class BedrockImageProcessor:
     """
     def __init__(self,
                  vision_region: str = 'us-east-1',
-                 translation_region: str = 'eu-west-1',
+                 translation_region: str = 'us-east-2',
                  background_removal_region: str = 'us-east-1'):
         # Instantiate other agents here
         # self.image_analyzer = BedrockImageAnalyzer(vision_region=vision_region, translation_region=translation_region)
         # self.background_remover = BedrockBackgroundRemover(region_name=background_removal_region)
         
-        # For now, we'll use raw boto3 clients for demonstration until agents are fully integrated
-        self._vision_client = boto3.client('bedrock-runtime', region_name=vision_region)
-        self._translation_client = boto3.client('bedrock-runtime', region_name=translation_region)
-        self._bg_remover_client = boto3.client('bedrock-runtime', region_name=background_removal_region)
+        # For now, we'll use raw boto3 clients for demonstration until agents are fully integrated.
+        # Clients are shared per region, so vision and background removal use one connection pool.
+        self._vision_client = get_client('bedrock-runtime', vision_region)
+        self._translation_client = get_client('bedrock-runtime', translation_region)
+        self._bg_remover_client = get_client('bedrock-runtime', background_removal_region)
+        # Runs background removal alongside description generation
+        self._executor = ThreadPoolExecutor(max_workers=8)
+        # LRU of (English, Icelandic) descriptions keyed on (image digest, product name)
+        self._description_cache: OrderedDict = OrderedDict()
+        self._description_cache_lock = threading.Lock()
+        # Pooled session so downloads from the same image host reuse TCP/TLS connections
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=64))
 
         self.default_vision_model_id = 'us.mistral.pixtral-large-2502-v1:0'
-        self.default_translation_model_id = 'openai.gpt-oss-120b-1:0'
+        # Translating seven short fields is a small-model job; Claude 3.5 Haiku offers
+        # latency-optimized inference through the US cross-region profile (served from us-east-2)
+        self.default_translation_model_id = 'us.anthropic.claude-3-5-haiku-20241022-v1:0'
+        self.translation_latency = 'optimized'
         self.default_bg_removal_model_id = 'amazon.nova-canvas-v1:0'
 
 
@@ -91,9 +269,9 @@ class BedrockImageProcessor:
             modelId=self.default_bg_removal_model_id,
             contentType='application/json',
             accept='application/json',
-            body=json.dumps(body)
+            body=dumps(body)
         )
-        result = json.loads(response['body'].read().decode('utf-8'))
+        result = loads(response['body'].read())
         if not result.get('images') or len(result['images']) == 0:
             raise ValueError('Nova Canvas failed to return a processed image')
         
@@ -104,25 +282,8 @@ class BedrockImageProcessor:
             metadata={"width": options.width, "height": options.height, "format": "png"}
         )
 
-    def _invoke_vision_model_for_description(self, base64_image: str, product_name: Optional[str]) -> ProductDescription:
-        """Internal method to invoke vision model for description generation."""
-        prompt = f"""Act as a high-end fashion copywriter for Hringekjan.is. 
-Generate elegant, professional product metadata for a premium second-hand item.
-
-Context:
-{f'- Product Name: {product_name}' if product_name else ''}
-
-Instructions:
-1. Provide a specific 'Elegant Name' (e.g., 'Tailored Silk Blouse' instead of just 'Shirt').
-2. Write a 3-sentence 'Marketing Description' that sounds timeless, sophisticated, and sustainable.
-3. Identify the product category (clothing, accessories, etc.).
-4. List main colors.
-5. Provide a product condition assessment (choose from: new_with_tags, like_new, very_good, good, fair).
-6. Suggest relevant SEO keywords.
-7. Include a 'Styling Tip'.
-
-Format your response as JSON with keys: short, long, category, colors, condition, keywords, stylingTip"""
-
+    def _invoke_vision_model(self, content: List[Dict[str, Any]]) -> str:
+        """Internal method to send image and text content to the vision model and return its text answer."""
         request_body = {
             "max_tokens": 1000,
             "temperature": 0.7,
@@ -130,20 +291,7 @@ Format your response as JSON with keys: short, long, category, colors, condition
             "messages": [
                 {
                     "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/png", # Assuming PNG, adjust if needed
-                                "data": base64_image
-                            }
-                        },
-                        {
-                            "type": "text",
-                            "text": prompt
-                        }
-                    ]
+                    "content": content
                 }
             ]
         }
@@ -152,31 +300,66 @@ Format your response as JSON with keys: short, long, category, colors, condition
             modelId=self.default_vision_model_id,
             contentType='application/json',
             accept='application/json',
-            body=json.dumps(request_body)
+            body=dumps(request_body)
         )
-        response_body = json.loads(response['body'].read().decode('utf-8'))
+        response_body = loads(response['body'].read())
         analysis_text: str = response_body.get('output', {}).get('message', {}).get('content', [{}])[0].get('text', '')
         if not analysis_text:
             raise ValueError(f"No text content in response from {self.default_vision_model_id}")
+        return analysis_text
 
-        json_match = re.search(r'\{[\s\S]*\}', analysis_text)
-        parsed_json = json.loads(json_match.group(0) if json_match else analysis_text)
-        
-        # Simplified condition validation
-        condition = parsed_json.get('condition')
-        valid_conditions = get_args(Literal["new_with_tags", "like_new", "very_good", "good", "fair"])
-        if condition not in valid_conditions:
-            condition = 'very_good'
+    def _invoke_vision_model_for_description(self, base64_image: str, product_name: Optional[str], media_type: str = 'image/png') -> ProductDescription:
+        """Internal method to invoke vision model for description generation."""
+        prompt = f"""Act as a high-end fashion copywriter for Hringekjan.is. 
+Generate elegant, professional product metadata for a premium second-hand item.
 
-        return ProductDescription(
-            short=parsed_json.get('short', product_name or 'Product'),
-            long=parsed_json.get('long', 'High-quality product processed and optimized for sale.'),
-            category=parsed_json.get('category', 'General'),
-            colors=parsed_json.get('colors') if isinstance(parsed_json.get('colors'), list) else (parsed_json.get('colors').split(',') if parsed_json.get('colors') else ['various']),
-            condition=condition,
-            keywords=parsed_json.get('keywords') if isinstance(parsed_json.get('keywords'), list) else (parsed_json.get('keywords').split(',') if parsed_json.get('keywords') else ['product']),
-            stylingTip=parsed_json.get('stylingTip')
-        )
+Context:
+{f'- Product Name: {product_name}' if product_name else ''}
+
+{DESCRIPTION_INSTRUCTIONS}
+
+Format your response as JSON with keys: short, long, category, colors, condition, keywords, stylingTip"""
+
+        analysis_text = self._invoke_vision_model([
+            _image_block(base64_image, media_type),
+            {
+                "type": "text",
+                "text": prompt
+            }
+        ])
+        return _description_from_json(_parse_model_json(analysis_text), product_name)
+
+    def _invoke_vision_model_for_descriptions_batch(self, images: List[Tuple[str, Optional[str]]]) -> List[ProductDescription]:
+        """
+        Internal method to describe several (base64 image, product name) pairs with one vision
+        model call, amortizing the per-request overhead. Descriptions come back in input order.
+        """
+        content: List[Dict[str, Any]] = []
+        context_lines: List[str] = []
+        for index, (base64_image, product_name) in enumerate(images, 1):
+            vision_image, media_type = _downscale_for_vision(base64_image)
+            content.append(_image_block(vision_image, media_type))
+            context_lines.append(f"- Image {index}: {product_name or 'no product name given'}")
+        context = '\n'.join(context_lines)
+
+        prompt = f"""Act as a high-end fashion copywriter for Hringekjan.is. 
+Generate elegant, professional product metadata for each of the {len(images)} premium second-hand items shown, one item per image.
+
+Context:
+{context}
+
+{DESCRIPTION_INSTRUCTIONS}
+
+Format your response as a JSON array with one object per image, in image order, each with keys: short, long, category, colors, condition, keywords, stylingTip"""
+        content.append({"type": "text", "text": prompt})
+
+        parsed_json = _parse_model_json(self._invoke_vision_model(content), _JSON_ARRAY_RE)
+        if not isinstance(parsed_json, list) or len(parsed_json) != len(images):
+            raise ValueError(f"Expected {len(images)} descriptions from {self.default_vision_model_id}")
+        return [
+            _description_from_json(item, product_name)
+            for item, (_, product_name) in zip(parsed_json, images)
+        ]
     
     def _translate_description(self, description: ProductDescription) -> ProductDescription:
         """Internal method to translate description."""
@@ -190,51 +373,157 @@ Condition: {description.condition or ''}
 Keywords: {', '.join(description.keywords) if description.keywords else ''}
 Styling Tip: {description.stylingTip or ''}
 
-Provide the response in the same JSON format with keys: short, long, category, colors, condition, keywords, stylingTip"""
-
-        request_body = {
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "max_tokens": 1000,
-            "temperature": 0.3
-        }
+Provide the response by calling the {TRANSLATION_TOOL_NAME} tool."""
 
-        response = self._translation_client.invoke_model(
+        # Converse gives every model the same request/response shape and accepts the latency tier.
+        # Forcing the tool call makes the model return the fields as structured JSON.
+        response = self._translation_client.converse(
             modelId=self.default_translation_model_id,
-            contentType='application/json',
-            accept='application/json',
-            body=json.dumps(request_body)
+            messages=[{"role": "user", "content": [{"text": prompt}]}],
+            inferenceConfig={"maxTokens": 1000, "temperature": 0.3},
+            toolConfig=TRANSLATION_TOOL_CONFIG,
+            performanceConfig={"latency": self.translation_latency}
         )
 
-        response_body = json.loads(response['body'].read().decode('utf-8'))
-        translation_text = response_body.get('choices', [{}])[0].get('message', {}).get('content', '') or response_body.get('content', '')
+        content_blocks = response.get('output', {}).get('message', {}).get('content', [])
+        tool_input = next((block['toolUse']['input'] for block in content_blocks if 'toolUse' in block), None)
+        if tool_input is not None:
+            translation_data = tool_input
+        else:
+            # Models without tool support answer in text
+            translation_text = next((block['text'] for block in content_blocks if 'text' in block), '')
+            translation_data = _parse_model_json(translation_text)
 
-        json_match = re.search(r'\{[\s\S]*\}', translation_text)
-        if json_match:
-            translation_text = json_match.group(0)
-        
-        translation_data = json.loads(translation_text)
-        
+        # Condition is a fixed vocabulary, not prose; an unknown value keeps the English one
+        condition = translation_data.get('condition')
+        if condition not in _VALID_CONDITIONS:
+            condition = description.condition
+
+        # Tool output is model output too, so the translated description is validated
         return ProductDescription(
             short=translation_data.get('short', description.short),
             long=translation_data.get('long', description.long),
             category=translation_data.get('category', description.category),
             colors=translation_data.get('colors') if isinstance(translation_data.get('colors'), list) else description.colors,
-            condition=translation_data.get('condition', description.condition),
+            condition=condition,
             keywords=translation_data.get('keywords') if isinstance(translation_data.get('keywords'), list) else description.keywords,
             stylingTip=translation_data.get('stylingTip', description.stylingTip)
         )
 
+    def _remove_background_safely(self, base64_image: str, options: ImageProcessingOptions) -> Optional[RemoveBackgroundResult]:
+        """Removes the background, reporting a failure instead of raising so the original image is kept."""
+        try:
+            return self._invoke_bg_removal_model(base64_image, options)
+        except Exception as e:
+            print(f"Background removal failed: {e}")
+            return None
+
+    def _cached_descriptions(
+        self, cache_key: Tuple[bytes, Optional[str]]
+    ) -> Optional[Tuple[ProductDescription, BilingualProductDescription]]:
+        """Returns copies of cached descriptions, so callers cannot mutate the cached ones."""
+        with self._description_cache_lock:
+            cached = self._description_cache.get(cache_key)
+            if cached:
+                self._description_cache.move_to_end(cache_key)
+        if not cached:
+            return None
+        product_desc, icelandic_desc = (desc.model_copy(deep=True) for desc in cached)
+        return product_desc, BilingualProductDescription(en=product_desc, is_=icelandic_desc)
+
+    def _cache_descriptions(
+        self, cache_key: Tuple[bytes, Optional[str]], product_desc: ProductDescription, icelandic_desc: ProductDescription
+    ) -> None:
+        with self._description_cache_lock:
+            self._description_cache[cache_key] = (product_desc.model_copy(deep=True), icelandic_desc.model_copy(deep=True))
+            if len(self._description_cache) > DESCRIPTION_CACHE_SIZE:
+                self._description_cache.popitem(last=False)
+
+    def _generate_descriptions(
+        self, base64_image: str, product_name: Optional[str]
+    ) -> Tuple[Optional[ProductDescription], Optional[BilingualProductDescription]]:
+        """Generates the English description and its Icelandic translation, reporting failures instead of raising."""
+        # Reprocessing the same photo (retries, pipeline re-runs) reuses the earlier descriptions
+        cache_key = _description_cache_key(base64_image, product_name)
+        cached = self._cached_descriptions(cache_key)
+        if cached:
+            return cached
 
+        product_desc: Optional[ProductDescription] = None
+        try:
+            vision_image, media_type = _downscale_for_vision(base64_image)
+            product_desc = self._invoke_vision_model_for_description(vision_image, product_name, media_type)
+            # Assuming bilingual description is always desired if description generation is on
+            icelandic_desc = self._translate_description(product_desc)
+            bilingual_desc = BilingualProductDescription(en=product_desc, is_=icelandic_desc)
+            # Cached only once the pair has built a valid bilingual description
+            self._cache_descriptions(cache_key, product_desc, icelandic_desc)
+            return product_desc, bilingual_desc
+        except Exception as e:
+            print(f"Description generation failed: {e}")
+            return product_desc, None
+
+    def _generate_descriptions_batch(
+        self, base64_images: List[str], product_names: List[Optional[str]]
+    ) -> List[Tuple[Optional[ProductDescription], Optional[BilingualProductDescription]]]:
+        """
+        Batch counterpart of _generate_descriptions: uncached images are described
+        VISION_BATCH_SIZE per vision call and the translations run concurrently.
+        """
+        results: List[Tuple[Optional[ProductDescription], Optional[BilingualProductDescription]]] = [(None, None)] * len(base64_images)
+        cache_keys = [_description_cache_key(image, name) for image, name in zip(base64_images, product_names)]
+
+        pending: List[int] = []
+        for index, cache_key in enumerate(cache_keys):
+            cached = self._cached_descriptions(cache_key)
+            if cached:
+                results[index] = cached
+            else:
+                pending.append(index)
+
+        english: Dict[int, ProductDescription] = {}
+        for start in range(0, len(pending), VISION_BATCH_SIZE):
+            chunk = pending[start:start + VISION_BATCH_SIZE]
+            try:
+                descriptions = self._invoke_vision_model_for_descriptions_batch([(base64_images[i], product_names[i]) for i in chunk])
+                english.update(zip(chunk, descriptions))
+            except Exception as e:
+                print(f"Description generation failed for images {chunk}: {e}")
+
+        translations = {index: self._executor.submit(self._translate_description, desc) for index, desc in english.items()}
+        for index, future in translations.items():
+            product_desc = english[index]
+            try:
+                icelandic_desc = future.result()
+                results[index] = (product_desc, BilingualProductDescription(en=product_desc, is_=icelandic_desc))
+                self._cache_descriptions(cache_keys[index], product_desc, icelandic_desc)
+            except Exception as e:
+                print(f"Description generation failed: {e}")
+                results[index] = (product_desc, None)
+        return results
+
+    def _build_result(
+        self,
+        base64_image: str,
+        content_type: str,
+        bg_removal_res: Optional[RemoveBackgroundResult],
+        descriptions: Tuple[Optional[ProductDescription], Optional[BilingualProductDescription]]
+    ) -> ProcessImageResult:
+        product_desc, bilingual_desc = descriptions
+        return ProcessImageResult(
+            output_buffer_b64=bg_removal_res.output_buffer_b64 if bg_removal_res else base64_image, # Fallback to original image
+            metadata={"content_type": content_type},
+            product_description=product_desc,
+            bilingual_description=bilingual_desc,
+            background_removal_result=bg_removal_res
+        )
+
+    @agent_tool
     def process_image_from_url(
         self,
-        image_url: str = Field(..., description="URL of the image to process."),
-        options: ImageProcessingOptions = Field(ImageProcessingOptions(), description="Processing options."),
-        product_name: Optional[str] = Field(None, description="Optional name of the product for context.")
+        image_url: str,
+        options: Optional[ImageProcessingOptions] = None,
+        product_name: Optional[str] = None
     ) -> ProcessImageResult:
         """
         Downloads an image from a URL and processes it, optionally removing the background
@@ -248,19 +537,25 @@ Provide the response in the same JSON format with keys: short, long, category, c
         Returns:
             A ProcessImageResult object.
         """
-        response = requests.get(image_url)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        base64_image = base64.b64encode(response.content).decode('utf-8')
-        content_type = response.headers.get('content-type', 'image/png')
+        # Streaming into one growing buffer avoids holding the chunk list and the joined
+        # body at the same time; leaving the block returns the connection to the pool
+        with self._http.get(image_url, stream=True, timeout=(3, 30)) as response:
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            image_bytes = bytearray()
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                image_bytes += chunk
+            content_type = response.headers.get('content-type', 'image/png')
+        base64_image = base64.b64encode(image_bytes).decode('ascii')
         
         return self.process_image_from_base64(base64_image, content_type, options, product_name)
 
+    @agent_tool
     def process_image_from_base64(
         self,
-        base64_image: str = Field(..., description="Base64 encoded image string."),
-        content_type: str = Field(..., description="Content type of the image (e.g., 'image/png')."),
-        options: ImageProcessingOptions = Field(ImageProcessingOptions(), description="Processing options."),
-        product_name: Optional[str] = Field(None, description="Optional name of the product for context.")
+        base64_image: str,
+        content_type: str,
+        options: Optional[ImageProcessingOptions] = None,
+        product_name: Optional[str] = None
     ) -> ProcessImageResult:
         """
         Processes a base64 encoded image, optionally removing the background
@@ -275,35 +570,89 @@ Provide the response in the same JSON format with keys: short, long, category, c
         Returns:
             A ProcessImageResult object.
         """
-        output_buffer_b64: Optional[str] = None
-        bg_removal_res: Optional[RemoveBackgroundResult] = None
-        product_desc: Optional[ProductDescription] = None
-        bilingual_desc: Optional[BilingualProductDescription] = None
-
+        options = options or ImageProcessingOptions()
+        # Background removal and description generation are independent Bedrock round trips:
+        # the removal runs in the pool while the description is generated from the original image
+        bg_removal_future: Optional[Future] = None
         if options.remove_background:
-            try:
-                bg_removal_res = self._invoke_bg_removal_model(base64_image, options)
-                output_buffer_b64 = bg_removal_res.output_buffer_b64
-            except Exception as e:
-                print(f"Background removal failed: {e}")
-                output_buffer_b64 = base64_image # Fallback to original image
-        else:
-            output_buffer_b64 = base64_image
+            bg_removal_future = self._executor.submit(self._remove_background_safely, base64_image, options)
 
-        if options.generate_description:
-            try:
-                product_desc = self._invoke_vision_model_for_description(output_buffer_b64, product_name)
-                # Assuming bilingual description is always desired if description generation is on
-                icelandic_desc = self._translate_description(product_desc)
-                bilingual_desc = BilingualProductDescription(en=product_desc, is_=icelandic_desc)
-            except Exception as e:
-                print(f"Description generation failed: {e}")
+        descriptions = self._generate_descriptions(base64_image, product_name) if options.generate_description else (None, None)
+        bg_removal_res = bg_removal_future.result() if bg_removal_future is not None else None
 
-        return ProcessImageResult(
-            output_buffer_b64=output_buffer_b64,
-            metadata={"content_type": content_type},
-            product_description=product_desc,
-            bilingual_description=bilingual_desc,
-            background_removal_result=bg_removal_res
+        return self._build_result(base64_image, content_type, bg_removal_res, descriptions)
+
+    @agent_tool
+    async def process_image_from_base64_async(
+        self,
+        base64_image: str,
+        content_type: str,
+        options: Optional[ImageProcessingOptions] = None,
+        product_name: Optional[str] = None
+    ) -> ProcessImageResult:
+        """
+        Async variant of process_image_from_base64 for callers running an event loop.
+        Background removal and description generation run concurrently without blocking the loop.
+
+        Args:
+            base64_image: The base64 encoded string of the image.
+            content_type: The content type of the image (e.g., 'image/png').
+            options: Image processing options.
+            product_name: Optional name of the product for context.
+
+        Returns:
+            A ProcessImageResult object.
+        """
+        options = options or ImageProcessingOptions()
+        bg_removal_res, descriptions = await asyncio.gather(
+            asyncio.to_thread(self._remove_background_safely, base64_image, options) if options.remove_background else _resolved(None),
+            asyncio.to_thread(self._generate_descriptions, base64_image, product_name) if options.generate_description else _resolved((None, None)),
+        )
+        return self._build_result(base64_image, content_type, bg_removal_res, descriptions)
+
+    @agent_tool
+    def process_images_batch(
+        self,
+        base64_images: List[str],
+        content_type: str,
+        options: Optional[ImageProcessingOptions] = None,
+        product_names: Optional[List[Optional[str]]] = None
+    ) -> List[ProcessImageResult]:
+        """
+        Processes several base64 encoded images, optionally removing their backgrounds
+        and generating product descriptions. Descriptions are generated for several
+        images per vision model call.
+
+        Args:
+            base64_images: The base64 encoded strings of the images.
+            content_type: The content type of the images (e.g., 'image/png').
+            options: Image processing options.
+            product_names: Optional product names, one per image in the same order.
+
+        Returns:
+            A list of ProcessImageResult objects in the same order as the images.
+
+        Raises:
+            ValueError: If product_names is given but its length differs from base64_images.
+        """
+        options = options or ImageProcessingOptions()
+        if product_names is None:
+            product_names = [None] * len(base64_images)
+        elif len(product_names) != len(base64_images):
+            raise ValueError(f"Expected {len(base64_images)} product names, got {len(product_names)}")
+
+        bg_removal_futures: List[Optional[Future]] = [
+            self._executor.submit(self._remove_background_safely, base64_image, options) if options.remove_background else None
+            for base64_image in base64_images
+        ]
+
+        descriptions = (
+            self._generate_descriptions_batch(base64_images, product_names)
+            if options.generate_description
+            else [(None, None)] * len(base64_images)
         )
 
+        return [
+            self._build_result(base64_image, content_type, future.result() if future is not None else None, image_descriptions)
+            for base64_image, future, image_descriptions in zip(base64_images, bg_removal_futures, descriptions)
+        ]
@@ -1,9 +1,32 @@
-import json
+import asyncio
+import hashlib
+import logging
 import re
-from typing import Literal, Optional, List, Dict, Any, get_args
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import FrozenSet, Literal, Optional, List, Dict, Any, Tuple
 
-import boto3
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+try:
+    from PIL import Image
+except ImportError:
+    # Without Pillow the model receives the PNG as uploaded
+    Image = None
+
+from .aws_clients import get_client
+from .fast_json import dumps, loads
+from .tooling import agent_tool
+
+logger = logging.getLogger(__name__)
 
 # --- Input Models ---
 class RekognitionHints(BaseModel):
@@ -12,9 +35,26 @@ class RekognitionHints(BaseModel):
     detectedSize: Optional[str] = None
     category: Optional[str] = None
     colors: Optional[List[str]] = None
+    # Rekognition moderation verdict (RekognitionAnalysisResult.approved / reason); the hints
+    # shortcut only applies when it is known, since the model's content check is skipped
+    approved: Optional[bool] = None
+    moderationReason: Optional[str] = None
+
+class PixtralAnalysisRequest(BaseModel):
+    """One image to analyze in a batch, with the same inputs as analyze_with_mistral_pixtral."""
+    processed_image_buffer_b64: str
+    product_name: Optional[str] = None
+    rekognition_hints: Optional[RekognitionHints] = None
 
 # --- Output Nested Models ---
+# Output models are validated from the model's JSON in lax mode: the model answers yes/no
+# questions with "yes" or "true" and sometimes quotes numbers, and one such field must not
+# fail the whole analysis. "null"-style strings are cleaned by before-validators.
+OUTPUT_CONFIG = ConfigDict(extra='ignore')
+
 class AiConfidence(BaseModel):
+    model_config = OUTPUT_CONFIG
+
     brand: Optional[float] = None
     size: Optional[float] = None
     material: Optional[float] = None
@@ -24,29 +64,48 @@ class AiConfidence(BaseModel):
     overall: float = Field(..., description="Overall AI confidence.")
 
 class PricingHints(BaseModel):
+    model_config = OUTPUT_CONFIG
+
     rarity: Literal["common", "uncommon", "rare", "vintage"] = Field("common")
     craftsmanship: Literal["poor", "fair", "good", "excellent"] = Field("fair")
     marketDemand: Literal["low", "medium", "high"] = Field("medium")
     estimatedAgeYears: Optional[int] = None
     brandTier: Literal["premium", "luxury", "designer", "mass-market", "unknown"] = Field("unknown")
 
+    @field_validator('estimatedAgeYears', mode='before')
+    @classmethod
+    def _age_to_int(cls, value: Any) -> Any:
+        # Integer validation rejects fractional estimates such as 2.5 or "2.5", so round them to whole years
+        if value is None or isinstance(value, int):
+            return value
+        try:
+            return round(float(value))
+        except (TypeError, ValueError):
+            return None
+
 class QualityHints(BaseModel):
+    model_config = OUTPUT_CONFIG
+
     materialQuality: Literal["poor", "fair", "good", "excellent"] = Field("fair")
     constructionQuality: Literal["poor", "fair", "good", "excellent"] = Field("fair")
     authenticity: Literal["questionable", "likely", "confirmed"] = Field("likely")
     visibleDefects: List[str] = Field([])
     wearPattern: Literal["minimal", "light", "moderate", "heavy"] = Field("light")
 
+_VALID_CONDITIONS: FrozenSet[str] = frozenset({"new_with_tags", "like_new", "very_good", "good", "fair"})
+
 # --- Main Output Model ---
 class MistralPixtralAnalysisResult(BaseModel):
+    model_config = OUTPUT_CONFIG
+
     brand: Optional[str] = None
     size: Optional[str] = None
     material: Optional[str] = None
 
     condition: Literal["new_with_tags", "like_new", "very_good", "good", "fair"]
     category: str
-    colors: List[str]
-    keywords: List[str]
+    colors: List[str] = Field(default_factory=list)
+    keywords: List[str] = Field(default_factory=list)
 
     approved: bool
     moderationReason: Optional[str] = None
@@ -70,15 +129,48 @@ class MistralPixtralAnalysisResult(BaseModel):
     pricingHints: Optional[PricingHints] = None
     qualityHints: Optional[QualityHints] = None
 
+    # Validators run inside model_validate_json, so the model's JSON is parsed in a single pass
+    @field_validator('short_en', 'long_en', 'short_is', 'long_is')
+    @classmethod
+    def _require_description(cls, value: str) -> str:
+        if not value:
+            raise ValueError('Mistral Pixtral Large response missing required description fields')
+        return value
+
+    @field_validator('brand', 'size', 'material', 'pattern', 'season', mode='before')
+    @classmethod
+    def _null_string_to_none(cls, value: Any) -> Any:
+        # Map optional "null" string values to None
+        return None if value == "null" else value
+
+    @field_validator('approved', mode='before')
+    @classmethod
+    def _strip_approval(cls, value: Any) -> Any:
+        # Lax bool parsing accepts yes/no and true/false in any case, but not surrounding whitespace
+        return value.strip() if isinstance(value, str) else value
+
+    @field_validator('colors', 'keywords', mode='before')
+    @classmethod
+    def _split_required_list(cls, value: Any) -> Any:
+        if value is None:
+            return []
+        return [item.strip() for item in value.split(',')] if isinstance(value, str) else value
+
+    @field_validator('style', 'occasion', 'careInstructions', mode='before')
+    @classmethod
+    def _split_optional_list(cls, value: Any) -> Any:
+        # Convert to list if comma-separated string
+        return [item.strip() for item in value.split(',')] if isinstance(value, str) else value
+
     # Post-processing to ensure valid conditions
     def model_post_init(self, __context: Any) -> None:
-        valid_conditions = ["new_with_tags", "like_new", "very_good", "good", "fair"]
-        if self.condition not in valid_conditions:
-            print(f"Warning: Invalid condition '{self.condition}', defaulting to 'very_good'")
+        if self.condition not in _VALID_CONDITIONS:
+            logger.warning("Invalid condition '%s', defaulting to 'very_good'", self.condition)
             self.condition = "very_good"
-        # Ensure confidence scores have defaults if not provided by model
+        # Ensure confidence scores have defaults if not provided by model.
+        # The defaults below are known to be valid, so they are built without validation.
         if not self.aiConfidence:
-            self.aiConfidence = AiConfidence(
+            self.aiConfidence = AiConfidence.model_construct(
                 brand=0.7 if self.brand else 0.0,
                 size=0.7 if self.size else 0.0,
                 material=0.7 if self.material else 0.0,
@@ -89,74 +181,22 @@ class MistralPixtralAnalysisResult(BaseModel):
             )
         # Set defaults for pricing hints if missing
         if not self.pricingHints:
-            self.pricingHints = PricingHints()
+            self.pricingHints = PricingHints.model_construct()
         # Set defaults for quality hints if missing
         if not self.qualityHints:
-            self.qualityHints = QualityHints()
+            self.qualityHints = QualityHints.model_construct()
 
 
-class MistralPixtralAnalyzer:
-    """
-    Agent for comprehensive image analysis using Mistral Pixtral Large on AWS Bedrock.
-    """
-    def __init__(self, region_name: str = 'us-east-1'):
-        self.bedrock_client = boto3.client('bedrock-runtime', region_name=region_name)
-        self.model_id = 'us.mistral.pixtral-large-2502-v1:0'
+# --- Prompt Templates ---
+# Static prompt text is built once; per-call values are filled in with format_map
+SYSTEM_PROMPT = "You are an expert fashion curator and copywriter for Hringekjan.is, a premium sustainable marketplace in Iceland. You provide elegant, sophisticated, timeless product descriptions that emphasize quality and sustainability.\n\n"
 
-    def analyze_with_mistral_pixtral(
-        self,
-        processed_image_buffer_b64: str = Field(..., description="Base64 encoded processed image buffer (PNG)."),
-        product_name: Optional[str] = Field(None, description="Optional name of the product for context."),
-        rekognition_hints: Optional[RekognitionHints] = Field(None, description="Hints from Rekognition analysis.")
-    ) -> MistralPixtralAnalysisResult:
-        """
-        Analyzes an image using Mistral Pixtral Large to extract product attributes,
-        generate descriptions, and provide pricing/quality hints.
-        """
-        system_prompt = "You are an expert fashion curator and copywriter for Hringekjan.is, a premium sustainable marketplace in Iceland. You provide elegant, sophisticated, timeless product descriptions that emphasize quality and sustainability.
-
-"
-
-        hints_text = ""
-        if rekognition_hints and rekognition_hints.labels:
-            hints_text = "
-
-**Context from image analysis:**
-"
-            hints_text += f"{', '.join(rekognition_hints.labels)}"
-            if rekognition_hints.detectedBrand:
-                hints_text += f"
-Possible brand: {rekognition_hints.detectedBrand}"
-            if rekognition_hints.detectedSize:
-                hints_text += f"
-Possible size: {rekognition_hints.detectedSize}"
-            if rekognition_hints.category:
-                hints_text += f"
-Category hint: {rekognition_hints.category}"
-            if rekognition_hints.colors:
-                hints_text += f"
-Color palette: {', '.join(rekognition_hints.colors)}"
-
-        task_prompt = ""
-        if rekognition_hints and rekognition_hints.labels:
-            task_prompt = f"""Analyze this luxury second-hand fashion item for Hringekjan.is marketplace.{f' Product name: "{product_name}"' if product_name else ''}
+TASK_PROMPT_WITH_HINTS = """Analyze this luxury second-hand fashion item for Hringekjan.is marketplace.{product_name_clause}
 
 **🔍 DETECTED FEATURES (PRIMARY SOURCE - USE THESE AS FOUNDATION):**
 Our computer vision analysis has already identified these features. Base your description primarily on these detected attributes:
 
-{f'• Detected visual elements: {", ".join(rekognition_hints.labels)}' if rekognition_hints.labels else ''}{
-  f'
-• Brand identified: {rekognition_hints.detectedBrand}' if rekognition_hints.detectedBrand else ''
-}{
-  f'
-• Size detected: {rekognition_hints.detectedSize}' if rekognition_hints.detectedSize else ''
-}{
-  f'
-• Category classification: {rekognition_hints.category}' if rekognition_hints.category else ''
-}{
-  f'
-• Color palette: {", ".join(rekognition_hints.colors)}' if rekognition_hints.colors else ''
-}
+{detected_features}
 
 **IMPORTANT:** These detected features are the PRIMARY BASIS for your description. Use visual analysis of the image to enhance and refine these facts, NOT to replace them.
 
@@ -183,8 +223,8 @@ Translate the same content naturally to Icelandic:
 - Elegant product name in Icelandic (maintaining detected feature references)
 - Same 3-sentence description in natural Icelandic (not literal translation)
 - Same styling tip in Icelandic"""
-        else:
-            task_prompt = f"""Analyze this luxury second-hand fashion item for Hringekjan.is marketplace.{f' Product name: "{product_name}"' if product_name else ''}
+
+TASK_PROMPT_NO_HINTS = """Analyze this luxury second-hand fashion item for Hringekjan.is marketplace.{product_name_clause}
 
 **TASK 1: EXTRACT FROM IMAGE (read visible tags/labels/logos)**
 Carefully examine the image for any visible text on tags, labels, or logos:
@@ -239,7 +279,7 @@ Evaluate based on what you can SEE in the image:
 
 **CRITICAL:** Base ALL assessments on VISUAL EVIDENCE from the image only. Do not speculate beyond what is visible."""
 
-        output_format_instruction = """
+OUTPUT_FORMAT_INSTRUCTION = """
 **OUTPUT FORMAT:**
 Return ONLY valid JSON (no markdown, no explanation, no code blocks):
 {
@@ -286,6 +326,357 @@ Return ONLY valid JSON (no markdown, no explanation, no code blocks):
     "wearPattern": "light"
   }
 }"""
+
+
+# Characters that matter when scanning for the end of a JSON object
+_JSON_STRUCTURE_RE = re.compile(r'[{}"\\]')
+
+
+def _scan_json_object(text: str) -> Tuple[int, Optional[int]]:
+    """
+    Locates the first JSON object in a model response, skipping any markdown fence or
+    commentary around it. Returns its start (-1 if there is none) and the end of the object
+    once it is balanced (None while it is still open). Only structural characters are
+    visited, and braces inside JSON strings are ignored.
+    """
+    start = text.find('{')
+    if start < 0:
+        return start, None
+    depth = 0
+    in_string = False
+    skip_pos = -1
+    for match in _JSON_STRUCTURE_RE.finditer(text, start):
+        pos = match.start()
+        if pos == skip_pos:
+            continue
+        char = text[pos]
+        if in_string:
+            if char == '\\':
+                # Skip whatever the backslash escapes, including a quote or another backslash
+                skip_pos = pos + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return start, pos + 1
+    return start, None
+
+
+def _extract_json(text: str) -> str:
+    """
+    Returns the first complete JSON object in a model response. Without a balanced object
+    the rest of the text is returned for the parser to reject.
+    """
+    start, end = _scan_json_object(text)
+    return text if start < 0 else text[start:end]
+
+
+def _stream_text(chunk: Dict[str, Any]) -> str:
+    """Text carried by one response stream chunk, in the Mistral or Nova chunk format."""
+    choices = chunk.get('choices')
+    if choices:
+        choice = choices[0]
+        return (choice.get('delta') or choice.get('message') or {}).get('content') or ''
+    return chunk.get('contentBlockDelta', {}).get('delta', {}).get('text', '')
+
+
+# JPEG quality for the analysis upload; high enough to keep tag and label text legible
+PIXTRAL_JPEG_QUALITY = 90
+
+
+def _compress_for_analysis(base64_image: str) -> Tuple[str, str]:
+    """
+    Re-encodes the processed PNG as JPEG at full resolution, which cuts the upload to a
+    fraction of its size. Returns the PNG unchanged when JPEG is not smaller, the image
+    cannot be read, or Pillow is not installed.
+    """
+    if Image is None:
+        return base64_image, 'image/png'
+    try:
+        image = Image.open(BytesIO(base64.b64decode(base64_image)))
+        if image.mode != 'RGB':
+            # JPEG has no alpha channel; flatten the removed background onto white
+            image = image.convert('RGBA')
+            flattened = Image.new('RGB', image.size, 'white')
+            flattened.paste(image, mask=image.getchannel('A'))
+            image = flattened
+        buffer = BytesIO()
+        image.save(buffer, format='JPEG', quality=PIXTRAL_JPEG_QUALITY)
+        jpeg_image = base64.b64encode(buffer.getvalue()).decode('ascii')
+        if len(jpeg_image) >= len(base64_image):
+            return base64_image, 'image/png'
+        return jpeg_image, 'image/jpeg'
+    except Exception as e:
+        logger.warning("Compressing the analysis image failed, sending the original PNG: %s", e)
+        return base64_image, 'image/png'
+
+
+# Number of analysis results kept for re-uploads of the same image
+ANALYSIS_CACHE_SIZE = 1024
+
+HintsKey = Tuple[Tuple[str, ...], Optional[str], Optional[str], Optional[str], Tuple[str, ...]]
+
+
+def _hints_key(rekognition_hints: Optional[RekognitionHints]) -> Optional[HintsKey]:
+    """Hashable form of the Rekognition hints, covering every field that shapes the prompt."""
+    if rekognition_hints is None:
+        return None
+    return (
+        tuple(rekognition_hints.labels or ()),
+        rekognition_hints.detectedBrand,
+        rekognition_hints.detectedSize,
+        rekognition_hints.category,
+        tuple(rekognition_hints.colors or ()),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _build_prompt(product_name: Optional[str], hints_key: Optional[HintsKey]) -> str:
+    """
+    Assembles the full analysis prompt. Cached on its inputs, so retries and re-analysis
+    of the same product skip the formatting.
+    """
+    product_name_clause = f' Product name: "{product_name}"' if product_name else ''
+    if not hints_key or not hints_key[0]:
+        task_prompt = TASK_PROMPT_NO_HINTS.format_map({'product_name_clause': product_name_clause})
+    else:
+        labels, detected_brand, detected_size, category, colors = hints_key
+        feature_lines = [f'• Detected visual elements: {", ".join(labels)}']
+        if detected_brand:
+            feature_lines.append(f'• Brand identified: {detected_brand}')
+        if detected_size:
+            feature_lines.append(f'• Size detected: {detected_size}')
+        if category:
+            feature_lines.append(f'• Category classification: {category}')
+        if colors:
+            feature_lines.append(f'• Color palette: {", ".join(colors)}')
+        task_prompt = TASK_PROMPT_WITH_HINTS.format_map({
+            'product_name_clause': product_name_clause,
+            'detected_features': '\n'.join(feature_lines),
+        })
+    return "".join((SYSTEM_PROMPT, task_prompt, OUTPUT_FORMAT_INSTRUCTION))
+
+
+# --- Hint-Based Descriptions ---
+# English and Icelandic nouns for the Rekognition categories that are specific enough to describe
+HINT_CATEGORY_NOUNS: Dict[str, Tuple[str, str]] = {
+    'apparel/dress': ('dress', 'kjóll'),
+    'apparel/outerwear': ('jacket', 'jakki'),
+    'apparel/top': ('top', 'toppur'),
+    'apparel/bottoms': ('trousers', 'buxur'),
+    'accessories/bag': ('bag', 'taska'),
+    'accessories/footwear': ('shoes', 'skór'),
+    'accessories/jewelry': ('jewelry', 'skartgripur'),
+}
+
+# Hint-based listings are described as very good: without the model there is no assessment of wear
+HINT_CONDITION = "very_good"
+
+# English and Icelandic condition phrases, neutral in gender so they fit every noun above
+HINT_CONDITION_PHRASES: Dict[str, Tuple[str, str]] = {
+    'new_with_tags': ('new with tags', 'í nýju ástandi með merkimiðum'),
+    'like_new': ('in like-new condition', 'í nánast nýju ástandi'),
+    'very_good': ('in very good condition', 'í mjög góðu ástandi'),
+    'good': ('in good condition', 'í góðu ástandi'),
+    'fair': ('in fair condition', 'í sæmilegu ástandi'),
+}
+
+HINT_LONG_EN = (
+    "A pre-loved {noun} from {brand} in {colors}, {condition}. "
+    "Chosen for lasting quality, it is ready for its next chapter. "
+    "Choosing second-hand keeps beautiful pieces in use and out of landfill."
+)
+
+HINT_LONG_IS = (
+    "{noun} frá {brand} {condition}. "
+    "Vönduð tíska sem er tilbúin í nýjan kafla. "
+    "Notuð tíska heldur fallegum fötum lengur í notkun."
+)
+
+
+def _synthesize_from_hints(
+    hints_key: HintsKey,
+    product_name: Optional[str],
+    approved: bool,
+    moderation_reason: Optional[str]
+) -> MistralPixtralAnalysisResult:
+    """
+    Describes an item from its Rekognition hints alone, for items whose hints already cover
+    brand, category and colors. Approval is Rekognition's moderation verdict. The values are
+    built here, so the result skips validation; confidence and hint defaults are filled in
+    by model_post_init.
+    """
+    labels, detected_brand, detected_size, category, colors = hints_key
+    noun_en, noun_is = HINT_CATEGORY_NOUNS[category]
+    condition_en, condition_is = HINT_CONDITION_PHRASES[HINT_CONDITION]
+    return MistralPixtralAnalysisResult.model_construct(
+        brand=detected_brand,
+        size=detected_size,
+        condition=HINT_CONDITION,
+        category=category,
+        colors=list(colors),
+        keywords=[label.lower() for label in labels[:7]],
+        approved=approved,
+        moderationReason=None if approved else moderation_reason,
+        short_en=product_name or f"{detected_brand} {noun_en.capitalize()}",
+        long_en=HINT_LONG_EN.format_map({
+            'noun': noun_en, 'brand': detected_brand, 'colors': ', '.join(colors).lower(), 'condition': condition_en,
+        }),
+        short_is=product_name or f"{noun_is.capitalize()} frá {detected_brand}",
+        long_is=HINT_LONG_IS.format_map({'noun': noun_is.capitalize(), 'brand': detected_brand, 'condition': condition_is}),
+    )
+
+
+class MistralPixtralAnalyzer:
+    """
+    Agent for comprehensive image analysis using Mistral Pixtral Large on AWS Bedrock.
+    """
+    def __init__(self, region_name: str = 'us-east-1', hints_shortcut_min_labels: Optional[int] = None):
+        # Shared per region, so every analyzer instance reuses one connection pool
+        self.bedrock_client = get_client('bedrock-runtime', region_name)
+        self.model_id = 'us.mistral.pixtral-large-2502-v1:0'
+        # When set, items whose hints carry a brand, a known category, colors and at least this
+        # many labels are described from templates instead of the model (see _hints_cover_listing)
+        self.hints_shortcut_min_labels = hints_shortcut_min_labels
+        # LRU of results keyed on (image digest, product name, hints), so re-uploads skip the model
+        self._analysis_cache: OrderedDict = OrderedDict()
+        self._analysis_cache_lock = threading.Lock()
+
+    @agent_tool
+    def analyze_with_mistral_pixtral(
+        self,
+        processed_image_buffer_b64: str,
+        product_name: Optional[str] = None,
+        rekognition_hints: Optional[RekognitionHints] = None
+    ) -> MistralPixtralAnalysisResult:
+        """
+        Analyzes an image using Mistral Pixtral Large to extract product attributes,
+        generate descriptions, and provide pricing/quality hints.
+
+        Args:
+            processed_image_buffer_b64: Base64 encoded processed image buffer (PNG).
+            product_name: Optional name of the product for context.
+            rekognition_hints: Hints from Rekognition analysis.
+
+        Returns:
+            A MistralPixtralAnalysisResult object.
+        """
+        hints_key = _hints_key(rekognition_hints)
+        if self._hints_cover_listing(hints_key, rekognition_hints):
+            return _synthesize_from_hints(
+                hints_key, product_name, rekognition_hints.approved, rekognition_hints.moderationReason
+            )
+
+        cache_key = (
+            hashlib.blake2b(processed_image_buffer_b64.encode('ascii'), digest_size=16).digest(),
+            product_name,
+            hints_key,
+        )
+        with self._analysis_cache_lock:
+            cached = self._analysis_cache.get(cache_key)
+            if cached:
+                self._analysis_cache.move_to_end(cache_key)
+        if cached:
+            return cached.model_copy(deep=True)
+
+        result = self._analyze(processed_image_buffer_b64, product_name, hints_key)
+        with self._analysis_cache_lock:
+            self._analysis_cache[cache_key] = result.model_copy(deep=True)
+            if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+        return result
+
+    @agent_tool
+    def analyze_batch(
+        self,
+        items: List[PixtralAnalysisRequest],
+        max_workers: int = 8
+    ) -> List[MistralPixtralAnalysisResult]:
+        """
+        Analyzes several images in parallel threads using Mistral Pixtral Large,
+        for callers without an event loop.
+
+        Args:
+            items: The images to analyze, each with optional product name and Rekognition hints.
+            max_workers: Maximum number of Bedrock calls in flight.
+
+        Returns:
+            A list of MistralPixtralAnalysisResult objects in the same order as the items.
+        """
+        if not items:
+            return []
+        # invoke_model blocks on socket I/O with the GIL released, so threads overlap the calls
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(
+                lambda item: self.analyze_with_mistral_pixtral(
+                    item.processed_image_buffer_b64, item.product_name, item.rekognition_hints
+                ),
+                items
+            ))
+
+    @agent_tool
+    async def analyze_batch_async(
+        self,
+        items: List[PixtralAnalysisRequest],
+        concurrency: int = 8
+    ) -> List[MistralPixtralAnalysisResult]:
+        """
+        Analyzes several images concurrently using Mistral Pixtral Large.
+
+        Args:
+            items: The images to analyze, each with optional product name and Rekognition hints.
+            concurrency: Maximum number of Bedrock calls in flight.
+
+        Returns:
+            A list of MistralPixtralAnalysisResult objects in the same order as the items.
+
+        Raises:
+            ValueError: If concurrency is less than 1.
+        """
+        # A zero-slot semaphore would never let a call through, hanging the batch
+        if concurrency < 1:
+            raise ValueError(f'concurrency must be at least 1, got {concurrency}')
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def analyze_one(item: PixtralAnalysisRequest) -> MistralPixtralAnalysisResult:
+            async with semaphore:
+                # The client is thread-safe, so the blocking call runs in a worker thread
+                return await asyncio.to_thread(
+                    self.analyze_with_mistral_pixtral,
+                    item.processed_image_buffer_b64, item.product_name, item.rekognition_hints
+                )
+
+        return await asyncio.gather(*(analyze_one(item) for item in items))
+
+    def _hints_cover_listing(self, hints_key: Optional[HintsKey], rekognition_hints: Optional[RekognitionHints]) -> bool:
+        """
+        Whether the Rekognition hints are complete enough to list the item without the model.
+        The moderation verdict must be known, because the model's content check is skipped.
+        """
+        if self.hints_shortcut_min_labels is None or not hints_key or rekognition_hints.approved is None:
+            return False
+        labels, detected_brand, _, category, colors = hints_key
+        return (
+            bool(detected_brand and colors)
+            and category in HINT_CATEGORY_NOUNS
+            and len(labels) >= self.hints_shortcut_min_labels
+        )
+
+    def _analyze(
+        self,
+        processed_image_buffer_b64: str,
+        product_name: Optional[str],
+        hints_key: Optional[HintsKey]
+    ) -> MistralPixtralAnalysisResult:
+        """Internal method that prompts Mistral Pixtral Large and parses its analysis."""
+        prompt = _build_prompt(product_name, hints_key)
+
+        analysis_image, media_type = _compress_for_analysis(processed_image_buffer_b64)
         request_body = {
             "messages": [{
                 "role": 'user',
@@ -293,77 +684,57 @@ Return ONLY valid JSON (no markdown, no explanation, no code blocks):
                     {
                         "type": 'image_url',
                         "image_url": {
-                            "url": f'data:image/png;base64,{processed_image_buffer_b64}'
+                            "url": f'data:{media_type};base64,{analysis_image}'
                         }
                     },
                     {
                         "type": 'text',
-                        "text": system_prompt + task_prompt + output_format_instruction
+                        "text": prompt
                     }
                 ]
             }]
         }
 
-        print('Invoking Mistral Pixtral Large for comprehensive analysis...', {
-            "productName": productName,
-            "hasRekognitionHints": bool(rekognition_hints),
-            "hintsLabels": len(rekognition_hints.labels) if rekognition_hints and rekognition_hints.labels else 0,
-            "modelId": self.model_id,
-        })
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Invoking Mistral Pixtral Large for comprehensive analysis... %s', {
+                "productName": product_name,
+                "hasRekognitionHints": hints_key is not None,
+                "hintsLabels": len(hints_key[0]) if hints_key else 0,
+                "modelId": self.model_id,
+            })
 
-        response = self.bedrock_client.invoke_model(
+        response = self.bedrock_client.invoke_model_with_response_stream(
             modelId=self.model_id,
             contentType='application/json',
             accept='application/json',
-            body=json.dumps(request_body)
-        )
-
-        response_body = json.loads(response['body'].read().decode('utf-8'))
-
-        print('Bedrock response structure:', {
-            "hasOutput": 'output' in response_body,
-            "hasChoices": 'choices' in response_body,
-            "hasMessage": 'message' in response_body,
-            "responseKeys": list(response_body.keys()),
-            "firstChoiceKeys": list(response_body.get('choices', [{}])[0].keys()) if response_body.get('choices') else []
-        })
-
-        # Try different response formats (Mistral vs Nova)
-        analysis_text = (
-            response_body.get('output', {}).get('message', {}).get('content', [{}])[0].get('text', '') or  # Nova format
-            response_body.get('choices', [{}])[0].get('message', {}).get('content', '') or        # Mistral format, direct content string
-            response_body.get('content', [{}])[0].get('text', '') or                    # Alternative format
-            ''
+            body=dumps(request_body)
         )
 
-        if not analysis_text:
-            print(f'Unable to extract text from response: {json.dumps(response_body, indent=2)[:500]}')
-            raise ValueError('No response from Mistral Pixtral Large')
-
-        # Extract JSON from response (handle markdown code blocks)
-        json_text = analysis_text
-        json_match = re.search(r'```json\s*(\{[\s\S]*?\})\s*```', analysis_text) or re.search(r'(\{[\s\S]*\})', analysis_text)
-        if json_match:
-            json_text = json_match.group(1) if json_match.group(1) else json_match.group(0)
-
-        result_data = json.loads(json_text)
-
-        # Validate required fields (simplified for Pydantic)
-        if not result_data.get('short_en') or not result_data.get('long_en') or 
-           not result_data.get('short_is') or not result_data.get('long_is'):
-            raise ValueError('Mistral Pixtral Large response missing required description fields')
-
-        # Map optional "null" string values to None
-        for key in ['brand', 'size', 'material', 'pattern', 'season']:
-            if result_data.get(key) == "null":
-                result_data[key] = None
-
-        # Convert to list if comma-separated string for colors, keywords, style, occasion, careInstructions
-        for key in ['colors', 'keywords', 'style', 'occasion', 'careInstructions']:
-            if isinstance(result_data.get(key), str):
-                result_data[key] = [item.strip() for item in result_data[key].split(',')]
-            elif result_data.get(key) is None:
-                result_data[key] = [] if key in ['colors', 'keywords', 'visibleDefects'] else None # Default to empty list for some fields
-
-        # Pydantic will handle further validation and defaults
-        return MistralPixtralAnalysisResult(**result_data)
+        # Text arrives as the model produces it. Reading stops as soon as the JSON object is
+        # closed, so any commentary the model appends afterwards is never waited for.
+        stream = response['body']
+        text_parts: List[str] = []
+        json_text: Optional[str] = None
+        for event in stream:
+            chunk = event.get('chunk')
+            if not chunk:
+                continue
+            text = _stream_text(loads(chunk['bytes']))
+            text_parts.append(text)
+            if '}' in text:
+                streamed_text = ''.join(text_parts)
+                start, end = _scan_json_object(streamed_text)
+                if end is not None:
+                    json_text = streamed_text[start:end]
+                    stream.close()
+                    break
+
+        if json_text is None:
+            analysis_text = ''.join(text_parts)
+            if not analysis_text:
+                logger.warning('Unable to extract text from response stream')
+                raise ValueError('No response from Mistral Pixtral Large')
+            json_text = _extract_json(analysis_text)
+
+        # Required descriptions, "null" strings and comma-separated lists are handled by the model's validators
+        return MistralPixtralAnalysisResult.model_validate_json(json_text)
@@ -1,17 +1,26 @@
+import asyncio
 import base64
-import json
 import re
 import time
 import uuid
-from typing import List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Literal, Mapping, Optional, Dict, Any, Tuple
 import concurrent.futures
 
 import boto3
-from pydantic import BaseModel, Field
+import numpy as np
+from numpy.typing import ArrayLike
+from pydantic import BaseModel, Field, PrivateAttr
 
 # DynamoDB marshalling/unmarshalling
 from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
 
+from .fast_json import dumps, loads
+from .tooling import agent_tool
+
 # --- Simplified/Placeholder Models from other modules ---
 
 class ImageFeatures(BaseModel):
@@ -80,6 +89,38 @@ class ProductEmbedding(BaseModel):
     productGroupId: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
+    _unit_vector: Optional[np.ndarray] = PrivateAttr(None)
+
+    @property
+    def unit_vector(self) -> np.ndarray:
+        """
+        The embedding as a unit-length float32 array, normalized once and reused,
+        so every cosine comparison against it is a single dot product.
+        """
+        if self._unit_vector is None:
+            self._unit_vector = normalize_embedding(self.embedding)
+        return self._unit_vector
+
+@dataclass(slots=True)
+class _EmbeddingRow:
+    """
+    An embedding as loaded from DynamoDB for internal use. Loading thousands of rows per search
+    skips Pydantic validation this way; public methods convert to ProductEmbedding.
+    """
+    imageId: str
+    embedding: np.ndarray # float32
+    productGroupId: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+    def to_model(self) -> ProductEmbedding:
+        # Rows come from our own decoder, so validation is skipped
+        return ProductEmbedding.model_construct(
+            imageId=self.imageId,
+            embedding=self.embedding.tolist(),
+            productGroupId=self.productGroupId,
+            metadata=self.metadata,
+        )
+
 class ProductGroup(BaseModel):
     groupId: str
     primaryImageId: str
@@ -110,40 +151,102 @@ SIMILARITY_THRESHOLDS = {
     'DIFFERENT': 0.0,
 }
 
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S%Z'
+
 MAX_IMAGE_SIZE = 20 * 1024 * 1024 # 20MB for Titan Multimodal
 
+# Attributes every embedding load reads. Similarity search only needs the stored unit vectors;
+# get_embeddings also reads `norm` to rescale them, and optionally `metadata`
+EMBEDDING_PROJECTION = '#imageId, #embedding, #productGroupId'
+EMBEDDING_PROJECTION_NAMES = {
+    '#imageId': 'imageId',
+    '#embedding': 'embedding',
+    '#productGroupId': 'productGroupId',
+}
+
+# DynamoDB caps a TransactWriteItems call at 100 operations
+TRANSACT_WRITE_LIMIT = 100
+
+# Concurrent Bedrock/DynamoDB calls per batch; each is a network round trip, so threads overlap the waits
+BATCH_IO_WORKERS = 16
+
+# Embeddings are stored as little-endian float16 bytes: 2KB per 1024-D vector instead of ~20KB of JSON,
+# and plenty of precision for comparisons against the similarity thresholds
+EMBEDDING_STORAGE_DTYPE = np.dtype('<f2')
+
+# Per-tenant similarity index: image ids, their group ids, and the stacked unit-length embeddings
+EmbeddingIndex = Tuple[np.ndarray, List[Optional[str]], np.ndarray]
+
+# Other writers share the table, so a cached index is reloaded once it is this old
+EMBEDDING_INDEX_TTL_SECONDS = 60
+
 # DynamoDB marshall/unmarshall helper
 _serializer = TypeSerializer()
 _deserializer = TypeDeserializer()
 
+# Attribute values for fixed shapes are built directly; TypeSerializer is only needed for free-form items
+_EMPTY_LIST_DDB = {'L': []}
+_LINK_ATTRIBUTE_NAMES = {
+    '#groupId': 'productGroupId',
+    '#updatedAt': 'updatedAt',
+}
+
+def _ddb_string(value: str) -> Dict[str, str]:
+    return {'S': value}
+
 def marshall(item: Dict[str, Any]) -> Dict[str, Any]:
     return {k: _serializer.serialize(v) for k, v in item.items()}
 
 def unmarshall(item: Dict[str, Any]) -> Dict[str, Any]:
     return {k: _deserializer.deserialize(v) for k, v in item.items()}
 
+def encode_embedding(embedding: ArrayLike) -> bytes:
+    return np.asarray(embedding, dtype=EMBEDDING_STORAGE_DTYPE).tobytes()
+
+def decode_embedding(value: Any) -> np.ndarray:
+    """Reads a stored embedding: float16 bytes (a Binary attribute), or a JSON string on older items."""
+    if isinstance(value, str):
+        return np.asarray(loads(value), dtype=np.float32)
+    return np.frombuffer(bytes(value), dtype=EMBEDDING_STORAGE_DTYPE).astype(np.float32)
+
 
 # --- Helper Functions (internal to class or simplified) ---
 
+_TENANT_RE = re.compile(r'[^a-zA-Z0-9_-]')
+
+# Every public method sanitizes its tenant and tenants repeat, so results are memoized
+@lru_cache(maxsize=128)
 def sanitize_tenant(tenant: str) -> str:
-    sanitized = re.sub(r'[^a-zA-Z0-9_-]', '', tenant)
+    sanitized = _TENANT_RE.sub('', tenant)
     if sanitized != tenant:
-        print(f"Warning: Tenant ID sanitized: "{tenant}" -> "{sanitized}"")
+        print(f'Warning: Tenant ID sanitized: "{tenant}" -> "{sanitized}"')
     if not sanitized:
         raise ValueError('Invalid tenant ID: must contain alphanumeric characters')
     return sanitized
 
-def cosine_similarity(a: List[float], b: List[float]) -> float:
-    if not a or not b:
+def cosine_similarity(a: ArrayLike, b: ArrayLike) -> float:
+    # float32 arrays pass through without a copy; the dot product and norms run in BLAS
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    if not a.size or not b.size:
         raise ValueError('Embedding arrays cannot be empty')
-    if len(a) != len(b):
-        raise ValueError(f"Embedding dimensions must match: {len(a)} vs {len(b)}")
+    if a.shape != b.shape:
+        raise ValueError(f"Embedding dimensions must match: {a.size} vs {b.size}")
 
-    dot_product = sum(x * y for x, y in zip(a, b))
-    norm_a = sum(x * x for x in a) ** 0.5
-    norm_b = sum(x * x for x in b) ** 0.5
+    norms = float(np.linalg.norm(a)) * float(np.linalg.norm(b))
+    return float(np.dot(a, b)) / norms if norms != 0 else 0.0
 
-    return dot_product / (norm_a * norm_b) if norm_a * norm_b != 0 else 0.0
+def normalize_embedding(embedding: ArrayLike) -> np.ndarray:
+    """Returns a unit-length float32 copy of an embedding; a zero vector stays zero."""
+    vector = np.array(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return vector
+
+def cosine_similarity_normed(a: np.ndarray, b: np.ndarray) -> float:
+    """Cosine similarity of two unit-length embeddings, which is just their dot product."""
+    return float(np.dot(a, b))
 
 def classify_similarity(similarity: float) -> Literal['SAME_PRODUCT', 'LIKELY_SAME', 'POSSIBLY_SAME', 'DIFFERENT']:
     if similarity >= SIMILARITY_THRESHOLDS['SAME_PRODUCT']: return 'SAME_PRODUCT'
@@ -151,13 +254,27 @@ def classify_similarity(similarity: float) -> Literal['SAME_PRODUCT', 'LIKELY_SA
     if similarity >= SIMILARITY_THRESHOLDS['POSSIBLY_SAME']: return 'POSSIBLY_SAME'
     return 'DIFFERENT'
 
+# Ascending thresholds and the match type for each bin np.digitize assigns
+_MATCH_TYPE_BINS = np.array([
+    SIMILARITY_THRESHOLDS['POSSIBLY_SAME'],
+    SIMILARITY_THRESHOLDS['LIKELY_SAME'],
+    SIMILARITY_THRESHOLDS['SAME_PRODUCT'],
+], dtype=np.float32)
+_MATCH_TYPES = np.array(['DIFFERENT', 'POSSIBLY_SAME', 'LIKELY_SAME', 'SAME_PRODUCT'], dtype=object)
+
+def classify_similarities(similarities: np.ndarray) -> np.ndarray:
+    """Vectorized classify_similarity: one match type per similarity."""
+    return _MATCH_TYPES[np.digitize(similarities, _MATCH_TYPE_BINS)]
+
 # Placeholder for getModelForTask
-def get_model_for_task(task: str, required: bool = False) -> Dict[str, Any]:
+# The answer per task is constant, so it is cached; read-only mappings keep callers from mutating the cached value
+@lru_cache(maxsize=8)
+def get_model_for_task(task: str, required: bool = False) -> Mapping[str, Any]:
     if task == 'embedding':
-        return {'id': 'amazon.titan-embed-image-v1', 'config': {}}
+        return MappingProxyType({'id': 'amazon.titan-embed-image-v1', 'config': MappingProxyType({})})
     if required:
         raise ValueError(f"No model found for task: {task}")
-    return {}
+    return MappingProxyType({})
 
 # Placeholder for batchExtractFeatures and calculateMultiSignalSimilarity
 async def _batch_extract_features(images: List[Dict[str, Any]], region: str, settings: MultiSignalSettings) -> List[ImageFeatures]:
@@ -168,23 +285,17 @@ async def _calculate_multi_signal_similarity(img1: ImageFeatures, img2: ImageFea
     # Simulate multi-signal similarity
     return SimilarityScore(totalScore=0.9, signalBreakdown=SignalBreakdown())
 
-# Placeholder for generateBatchImageEmbeddings
-async def _generate_batch_image_embeddings(image_inputs: List[ImageInput]) -> BatchEmbeddingResult:
-    embeddings_map = {}
-    errors = []
-    for img_input in image_inputs:
-        if len(img_input.buffer) > MAX_IMAGE_SIZE:
-            errors.append({'imageId': img_input.imageId, 'error': 'Image too large'})
-            continue
-        # Simulate embedding generation
-        embeddings_map[img_input.imageId] = {'embedding': [0.1] * 1024} # Dummy embedding
-    return BatchEmbeddingResult(
-        successCount=len(embeddings_map),
-        failureCount=len(errors),
-        totalTimeMs=1000, # Dummy time
-        embeddings=embeddings_map,
-        errors=errors
-    )
+async def _run_in_threads(func, args: List[Tuple[Any, ...]]) -> List[Any]:
+    """
+    Runs blocking calls on a pool of BATCH_IO_WORKERS threads without blocking the event loop.
+    Results come back in argument order; a failed call yields its exception instead of raising.
+    """
+    loop = asyncio.get_running_loop()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=BATCH_IO_WORKERS) as pool:
+        return await asyncio.gather(
+            *(loop.run_in_executor(pool, func, *call_args) for call_args in args),
+            return_exceptions=True,
+        )
 
 
 class ProductIdentityGrouper:
@@ -196,8 +307,15 @@ class ProductIdentityGrouper:
         self.bedrock_client = boto3.client('bedrock-runtime', region_name=region_name)
         self.dynamo_client = boto3.client('dynamodb', region_name=region_name)
         self.table_name = table_name
+        # Tenant -> (monotonic load time, similarity index); this instance's own writes are applied in place
+        self._embedding_cache: Dict[str, Tuple[float, EmbeddingIndex]] = {}
 
+    @agent_tool
     async def generate_image_embedding(self, image_buffer: bytes) -> List[float]:
+        return self._invoke_titan(image_buffer)
+
+    def _invoke_titan(self, image_buffer: bytes) -> List[float]:
+        # Blocking, so batches can fan it out across threads
         if len(image_buffer) > MAX_IMAGE_SIZE:
             raise ValueError(f"Image too large: {(len(image_buffer) / 1024 / 1024):.1f}MB (max 20MB)")
         if not image_buffer:
@@ -211,20 +329,40 @@ class ProductIdentityGrouper:
             modelId=embedding_model['id'],
             contentType='application/json',
             accept='application/json',
-            body=json.dumps({
+            body=dumps({
                 'inputImage': base64_image,
                 'embeddingConfig': {'outputEmbeddingLength': 1024},
             })
         )
-        response_body = json.loads(response['body'].read().decode('utf-8'))
+        response_body = loads(response['body'].read())
 
         if not response_body.get('embedding') or not isinstance(response_body['embedding'], list):
-            raise ValueError(f"Invalid Bedrock response: missing or invalid embedding. Response: {json.dumps(response_body)[:200]}")
+            raise ValueError(f"Invalid Bedrock response: missing or invalid embedding. Response: {dumps(response_body)[:200].decode('utf-8', 'replace')}")
         if not response_body['embedding']:
             raise ValueError('Invalid Bedrock response: embedding array is empty')
 
         return response_body['embedding']
 
+    async def _generate_batch_image_embeddings(self, image_inputs: List[ImageInput]) -> BatchEmbeddingResult:
+        start_time = time.time()
+        results = await _run_in_threads(self._invoke_titan, [(img_input.buffer,) for img_input in image_inputs])
+
+        embeddings_map: Dict[str, Any] = {}
+        errors: List[Any] = []
+        for img_input, result in zip(image_inputs, results):
+            if isinstance(result, Exception):
+                errors.append({'imageId': img_input.imageId, 'error': str(result)})
+            else:
+                embeddings_map[img_input.imageId] = {'embedding': result}
+        return BatchEmbeddingResult(
+            successCount=len(embeddings_map),
+            failureCount=len(errors),
+            totalTimeMs=int((time.time() - start_time) * 1000),
+            embeddings=embeddings_map,
+            errors=errors
+        )
+
+    @agent_tool
     async def store_embedding(
         self,
         image_id: str,
@@ -233,92 +371,253 @@ class ProductIdentityGrouper:
         metadata: Optional[Dict[str, Any]] = None
     ) -> None:
         safe_tenant = sanitize_tenant(tenant)
+        self._put_embedding(image_id, embedding, safe_tenant, metadata)
+        self._index_add(safe_tenant, [(image_id, embedding)])
+
+    @agent_tool
+    async def store_embeddings_batch(
+        self,
+        embeddings: List[ProductEmbedding],
+        tenant: str = DEFAULT_TENANT
+    ) -> Dict[str, str]:
+        """
+        Stores many embeddings with concurrent DynamoDB writes.
+        Returns the error message for each image whose write failed; an empty dict means all succeeded.
+        """
+        safe_tenant = sanitize_tenant(tenant)
+        results = await _run_in_threads(
+            self._put_embedding,
+            [(e.imageId, e.embedding, safe_tenant, e.metadata) for e in embeddings],
+        )
+        self._index_add(safe_tenant, [
+            (e.imageId, e.embedding)
+            for e, result in zip(embeddings, results)
+            if not isinstance(result, Exception)
+        ])
+        return {
+            e.imageId: str(result)
+            for e, result in zip(embeddings, results)
+            if isinstance(result, Exception)
+        }
+
+    def _put_embedding(
+        self,
+        image_id: str,
+        embedding: List[float],
+        safe_tenant: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
         pk = f"TENANT#{safe_tenant}#EMBEDDING"
         sk = f"IMAGE#{image_id}"
 
+        # Stored embeddings are L2-normalized, so similarity against them is a plain dot product;
+        # the original length is kept in `norm` so get_embeddings can rescale to the raw vector
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+
         item = {
             'PK': pk,
             'SK': sk,
             'imageId': image_id,
-            'embedding': json.dumps(embedding), # Store as JSON string
+            'embedding': encode_embedding(vector / (norm or 1.0)), # Stored as a Binary attribute
+            'norm': Decimal(str(norm)), # DynamoDB numbers must be Decimal, not float
             'metadata': metadata,
             'entityType': 'EMBEDDING',
-            'createdAt': time.time(), # Using unix timestamp for consistency
+            'createdAt': Decimal(str(time.time())), # Using unix timestamp for consistency
             'ttl': int(time.time()) + (30 * 24 * 60 * 60), # 30 days TTL
         }
         self.dynamo_client.put_item(TableName=self.table_name, Item=marshall(item))
 
-    async def get_embeddings(self, tenant: str = DEFAULT_TENANT, limit: int = 10000) -> List[ProductEmbedding]:
+    @agent_tool
+    async def get_embeddings(
+        self,
+        tenant: str = DEFAULT_TENANT,
+        limit: int = 10000,
+        include_metadata: bool = True
+    ) -> List[ProductEmbedding]:
+        """
+        Returns the tenant's embeddings as they were stored: each unit vector is scaled back
+        by its recorded `norm` (float16 storage rounds the values slightly).
+        """
         safe_tenant = sanitize_tenant(tenant)
-        pk = f"TENANT#{safe_tenant}#EMBEDDING"
-
-        embeddings: List[ProductEmbedding] = []
-        last_evaluated_key: Optional[Dict[str, Any]] = None
-        page_size = 1000
-
-        while True:
-            response = self.dynamo_client.query(
-                TableName=self.table_name,
-                KeyConditionExpression='PK = :pk',
-                ExpressionAttributeValues={':pk': {'S': pk}},
-                Limit=min(page_size, limit - len(embeddings)),
-                ExclusiveStartKey=last_evaluated_key,
-            )
+        rows = self._load_embeddings(safe_tenant, limit, include_metadata, rescale=True)
+        return [row.to_model() for row in rows]
 
-            for item in response.get('Items', []):
-                data = unmarshall(item)
-                try:
-                    embeddings.append(ProductEmbedding(
-                        imageId=data['imageId'],
-                        embedding=json.loads(data['embedding']),
-                        productGroupId=data.get('productGroupId'),
-                        metadata=data.get('metadata'),
-                    ))
-                except (json.JSONDecodeError, KeyError) as e:
-                    print(f"Skipping corrupted embedding for image {data.get('imageId')}: {e}")
+    def _load_embeddings(
+        self,
+        safe_tenant: str,
+        limit: int = 10000,
+        include_metadata: bool = True,
+        rescale: bool = False
+    ) -> List[_EmbeddingRow]:
+        """
+        Loads the tenant's embedding rows. Vectors stay unit length unless `rescale` is set,
+        which also reads each item's `norm` to restore the original vector.
+        """
+        pk = f"TENANT#{safe_tenant}#EMBEDDING"
 
-            last_evaluated_key = response.get('LastEvaluatedKey')
-            if not last_evaluated_key or len(embeddings) >= limit:
-                break
+        projection = EMBEDDING_PROJECTION
+        names = dict(EMBEDDING_PROJECTION_NAMES)
+        if include_metadata:
+            projection += ', #metadata'
+            names['#metadata'] = 'metadata'
+        if rescale:
+            projection += ', #norm'
+            names['#norm'] = 'norm'
+        pages = iter(self.dynamo_client.get_paginator('query').paginate(
+            TableName=self.table_name,
+            KeyConditionExpression='PK = :pk',
+            ExpressionAttributeValues={':pk': {'S': pk}},
+            ProjectionExpression=projection,
+            ExpressionAttributeNames=names,
+            ReturnConsumedCapacity='NONE',
+            PaginationConfig={'MaxItems': limit, 'PageSize': 1000},
+        ))
+
+        embeddings: List[_EmbeddingRow] = []
+        # Fetch the next page in the background while this one is decoded
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as prefetch:
+            next_page = prefetch.submit(next, pages, None)
+            while (page := next_page.result()) is not None:
+                next_page = prefetch.submit(next, pages, None)
+
+                for item in page.get('Items', []):
+                    data = unmarshall(item)
+                    try:
+                        embedding = decode_embedding(data['embedding'])
+                        # Older JSON items were stored raw and carry no norm
+                        if rescale and data.get('norm') is not None:
+                            embedding *= float(data['norm'])
+                        embeddings.append(_EmbeddingRow(
+                            imageId=data['imageId'],
+                            embedding=embedding,
+                            productGroupId=data.get('productGroupId'),
+                            metadata=data.get('metadata'),
+                        ))
+                    except (ValueError, KeyError) as e:
+                        print(f"Skipping corrupted embedding for image {data.get('imageId')}: {e}")
         return embeddings
 
+    async def _get_embedding_index(self, safe_tenant: str) -> EmbeddingIndex:
+        """
+        Returns the tenant's embeddings stacked into one (N, D) float32 matrix of unit vectors,
+        so a search is a single matrix-vector product. The matrix is reloaded from DynamoDB
+        once the cached copy is older than EMBEDDING_INDEX_TTL_SECONDS.
+        """
+        cached = self._embedding_cache.get(safe_tenant)
+        if cached is not None and time.monotonic() - cached[0] <= EMBEDDING_INDEX_TTL_SECONDS:
+            return cached[1]
+
+        loaded_at = time.monotonic()
+        embeddings = self._load_embeddings(safe_tenant, include_metadata=False)
+        ids = np.array([e.imageId for e in embeddings], dtype=object)
+        group_ids = [e.productGroupId for e in embeddings]
+        try:
+            matrix = np.stack([normalize_embedding(e.embedding) for e in embeddings]) if embeddings else np.empty((0, 0), dtype=np.float32)
+        except ValueError as e:
+            # Rows of differing length cannot share a matrix; keep the ones matching the most common length
+            sizes = [len(item.embedding) for item in embeddings]
+            size = max(set(sizes), key=sizes.count)
+            print(f"Skipping embeddings whose dimensions differ from {size}: {e}")
+            keep = [i for i, n in enumerate(sizes) if n == size]
+            ids = ids[keep]
+            group_ids = [group_ids[i] for i in keep]
+            matrix = np.stack([normalize_embedding(embeddings[i].embedding) for i in keep])
+        index = (ids, group_ids, matrix)
+        self._embedding_cache[safe_tenant] = (loaded_at, index)
+        return index
+
+    def _index_add(self, safe_tenant: str, rows: List[Tuple[str, ArrayLike]]) -> None:
+        """
+        Adds freshly stored embeddings to the tenant's cached index instead of reloading it.
+        A stored image replaces its old row, and put_item has dropped its group id.
+        """
+        cached = self._embedding_cache.get(safe_tenant)
+        if cached is None or not rows:
+            return
+        loaded_at, (ids, group_ids, matrix) = cached
+
+        latest = dict(rows)
+        try:
+            vectors = np.stack([normalize_embedding(embedding) for embedding in latest.values()])
+        except ValueError:
+            vectors = None
+        if vectors is None or (len(ids) and vectors.shape[1] != matrix.shape[1]):
+            # Cannot share the matrix; let the next search reload
+            self._embedding_cache.pop(safe_tenant, None)
+            return
+
+        keep = [i for i, image_id in enumerate(ids) if image_id not in latest]
+        self._embedding_cache[safe_tenant] = (loaded_at, (
+            np.concatenate([ids[keep], np.array(list(latest), dtype=object)]),
+            [group_ids[i] for i in keep] + [None] * len(latest),
+            np.vstack([matrix[keep], vectors]) if keep else vectors,
+        ))
+
+    def _index_set_group(self, safe_tenant: str, image_ids: List[str], group_id: str) -> None:
+        """Points cached rows at their new product group."""
+        cached = self._embedding_cache.get(safe_tenant)
+        if cached is None:
+            return
+        ids, group_ids, _ = cached[1]
+        targets = set(image_ids)
+        for i, image_id in enumerate(ids):
+            if image_id in targets:
+                group_ids[i] = group_id
+
+    @agent_tool
     async def find_similar_images(
         self,
         embedding: List[float],
         tenant: str = DEFAULT_TENANT,
-        exclude_image_id: Optional[str] = None
+        exclude_image_id: Optional[str] = None,
+        limit: Optional[int] = None
     ) -> List[SimilarityMatch]:
+        """
+        Matches at or above the POSSIBLY_SAME threshold, most similar first.
+        With a limit, only the top `limit` are selected and sorted.
+        """
         safe_tenant = sanitize_tenant(tenant)
-        existing_embeddings = await self.get_embeddings(safe_tenant)
-
-        matches: List[SimilarityMatch] = []
-
-        for existing in existing_embeddings:
-            if exclude_image_id and existing.imageId == exclude_image_id:
-                continue
-            
-            try:
-                similarity = cosine_similarity(embedding, existing.embedding)
-                match_type = classify_similarity(similarity)
-
-                if match_type != 'DIFFERENT':
-                    matches.append(SimilarityMatch(
-                        imageId=existing.imageId,
-                        similarity=similarity,
-                        matchType=match_type,
-                        groupId=existing.productGroupId,
-                    ))
-            except ValueError as e:
-                print(f"Error calculating similarity for {existing.imageId}: {e}")
-
-        return sorted(matches, key=lambda x: x.similarity, reverse=True)
+        ids, group_ids, matrix = await self._get_embedding_index(safe_tenant)
+        if not len(ids):
+            return []
+
+        query = normalize_embedding(embedding)
+        if matrix.shape[1:] != query.shape:
+            print(f"Error calculating similarity: embedding dimensions must match: {query.size} vs {matrix.shape[1]}")
+            return []
+
+        # One matrix-vector product scores every stored embedding at once
+        similarities = matrix @ query
+        mask = similarities >= SIMILARITY_THRESHOLDS['POSSIBLY_SAME']
+        if exclude_image_id:
+            mask &= ids != exclude_image_id
+
+        hits = np.flatnonzero(mask)
+        if limit is not None and limit < len(hits):
+            # Partial selection is O(N); only the k survivors get sorted
+            hits = hits[np.argpartition(-similarities[hits], limit)[:limit]] if limit > 0 else hits[:0]
+        hits = hits[np.argsort(-similarities[hits], kind='stable')]
+
+        hit_similarities = similarities[hits]
+        return [
+            SimilarityMatch(
+                imageId=ids[i],
+                similarity=similarity,
+                matchType=match_type,
+                groupId=group_ids[i],
+            )
+            for i, similarity, match_type in zip(hits, hit_similarities.tolist(), classify_similarities(hit_similarities))
+        ]
 
+    @agent_tool
     async def create_product_group(
         self,
         image_ids: List[str],
         tenant: str = DEFAULT_TENANT,
         product_name: Optional[str] = None,
-        category: Optional[str] = None
+        category: Optional[str] = None,
+        now_iso: Optional[str] = None
     ) -> ProductGroup:
         if not image_ids:
             raise ValueError('Cannot create product group: image_ids array is empty')
@@ -327,6 +626,8 @@ class ProductIdentityGrouper:
         group_id = f"pg_{uuid.uuid4()}" # Using uuid.uuid4() for collision-safe ID generation
         pk = f"TENANT#{safe_tenant}#PRODUCT_GROUP"
         sk = f"GROUP#{group_id}"
+        # One timestamp for the group and every link it writes
+        now_iso = now_iso or time.strftime(TIMESTAMP_FORMAT, time.gmtime())
 
         group = ProductGroup(
             groupId=group_id,
@@ -335,8 +636,8 @@ class ProductIdentityGrouper:
             productName=product_name,
             category=category,
             confidence=1.0,
-            createdAt=time.strftime('%Y-%m-%dT%H:%M:%S%Z', time.gmtime()),
-            updatedAt=time.strftime('%Y-%m-%dT%H:%M:%S%Z', time.gmtime()),
+            createdAt=now_iso,
+            updatedAt=now_iso,
             tenant=safe_tenant,
         )
 
@@ -344,40 +645,59 @@ class ProductIdentityGrouper:
             'PK': pk,
             'SK': sk,
             **group.model_dump(),
+            'confidence': Decimal(str(group.confidence)), # DynamoDB numbers must be Decimal, not float
             'entityType': 'PRODUCT_GROUP',
             'ttl': int(time.time()) + (90 * 24 * 60 * 60), # 90 days
         }
         self.dynamo_client.put_item(TableName=self.table_name, Item=marshall(item))
 
-        for image_id in image_ids:
-            await self.link_image_to_group(image_id, group_id, safe_tenant)
-        
+        self._link_images_to_group(image_ids, group_id, safe_tenant, now_iso)
+
         return group
 
+    def _link_update(self, safe_tenant: str, image_id: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Arguments of the update that points an embedding at its product group.
+        `values` comes from _link_values and can be shared by every image of one group.
+        """
+        return {
+            'TableName': self.table_name,
+            'Key': {'PK': _ddb_string(f"TENANT#{safe_tenant}#EMBEDDING"), 'SK': _ddb_string(f"IMAGE#{image_id}")},
+            'UpdateExpression': 'SET #groupId = :groupId, #updatedAt = :updatedAt',
+            'ExpressionAttributeNames': _LINK_ATTRIBUTE_NAMES,
+            'ExpressionAttributeValues': values,
+        }
+
+    @staticmethod
+    def _link_values(group_id: str, now_iso: str) -> Dict[str, Any]:
+        return {':groupId': _ddb_string(group_id), ':updatedAt': _ddb_string(now_iso)}
+
+    def _link_images_to_group(self, image_ids: List[str], group_id: str, safe_tenant: str, now_iso: str) -> None:
+        # One transaction per 100 images instead of a round trip per image.
+        # A transaction may not touch the same item twice, so repeated ids are dropped.
+        unique_ids = list(dict.fromkeys(image_ids))
+        values = self._link_values(group_id, now_iso)
+        for start in range(0, len(unique_ids), TRANSACT_WRITE_LIMIT):
+            self.dynamo_client.transact_write_items(TransactItems=[
+                {'Update': self._link_update(safe_tenant, image_id, values)}
+                for image_id in unique_ids[start:start + TRANSACT_WRITE_LIMIT]
+            ])
+        self._index_set_group(safe_tenant, unique_ids, group_id)
+
+    @agent_tool
     async def link_image_to_group(
         self,
         image_id: str,
         group_id: str,
-        tenant: str = DEFAULT_TENANT
+        tenant: str = DEFAULT_TENANT,
+        now_iso: Optional[str] = None
     ) -> None:
         safe_tenant = sanitize_tenant(tenant)
-        pk = f"TENANT#{safe_tenant}#EMBEDDING"
-        sk = f"IMAGE#{image_id}"
-
-        self.dynamo_client.update_item(
-            TableName=self.table_name,
-            Key={'PK': {'S': pk}, 'SK': {'S': sk}},
-            UpdateExpression='SET #groupId = :groupId, #updatedAt = :updatedAt',
-            ExpressionAttributeNames={
-                '#groupId': 'productGroupId',
-                '#updatedAt': 'updatedAt',
-            },
-            ExpressionAttributeValues=marshall({
-                ':groupId': group_id,
-                ':updatedAt': time.strftime('%Y-%m-%dT%H:%M:%S%Z', time.gmtime()),
-            }),
-        )
+        now_iso = now_iso or time.strftime(TIMESTAMP_FORMAT, time.gmtime())
+        self.dynamo_client.update_item(**self._link_update(safe_tenant, image_id, self._link_values(group_id, now_iso)))
+        self._index_set_group(safe_tenant, [image_id], group_id)
 
+    @agent_tool
     async def add_image_to_group_record(
         self,
         image_id: str,
@@ -398,12 +718,12 @@ class ProductIdentityGrouper:
                     '#imageIds': 'imageIds',
                     '#updatedAt': 'updatedAt',
                 },
-                ExpressionAttributeValues=marshall({
-                    ':newImage': [image_id],
-                    ':empty': [],
-                    ':imageId': image_id,
-                    ':updatedAt': time.strftime('%Y-%m-%dT%H:%M:%S%Z', time.gmtime()),
-                }),
+                ExpressionAttributeValues={
+                    ':newImage': {'L': [_ddb_string(image_id)]},
+                    ':empty': _EMPTY_LIST_DDB,
+                    ':imageId': _ddb_string(image_id),
+                    ':updatedAt': _ddb_string(time.strftime(TIMESTAMP_FORMAT, time.gmtime())),
+                },
                 ReturnValues='ALL_NEW',
             )
             return ProductGroup(**unmarshall(response['Attributes'])) if 'Attributes' in response else None
@@ -413,6 +733,7 @@ class ProductIdentityGrouper:
         except Exception as e:
             raise e
 
+    @agent_tool
     async def get_product_group_by_id(
         self,
         group_id: str,
@@ -428,6 +749,7 @@ class ProductIdentityGrouper:
         )
         return ProductGroup(**unmarshall(response['Item'])) if 'Item' in response else None
 
+    @agent_tool
     async def get_product_groups(
         self,
         tenant: str = DEFAULT_TENANT,
@@ -445,6 +767,7 @@ class ProductIdentityGrouper:
         )
         return [ProductGroup(**unmarshall(item)) for item in response.get('Items', [])]
 
+    @agent_tool
     async def process_image_for_grouping(
         self,
         image_id: str,
@@ -480,6 +803,7 @@ class ProductIdentityGrouper:
             'isNewGroup': is_new_group,
         }
 
+    @agent_tool
     async def cluster_by_similarity(
         self,
         embeddings: List[ProductEmbedding], # Changed from generic dict to ProductEmbedding
@@ -489,8 +813,25 @@ class ProductIdentityGrouper:
         settings: Optional[MultiSignalSettings] = None
     ) -> List[List[str]]:
         clusters: List[List[str]] = []
-        assigned = set()
+        if not embeddings:
+            return clusters
+
+        if not (use_multi_signal and image_metadata_map and settings):
+            # Cosine only: every pairwise similarity comes from one gram matrix of unit vectors
+            matrix = np.stack([item.unit_vector for item in embeddings])
+            # Threshold the whole matrix in one pass; the greedy loop below only combines boolean rows
+            adjacent = (matrix @ matrix.T) >= threshold
+            taken = np.zeros(len(embeddings), dtype=bool)
+            for i in range(len(embeddings)):
+                if taken[i]:
+                    continue
+                taken[i] = True
+                members = np.flatnonzero(adjacent[i] & ~taken)
+                taken[members] = True
+                clusters.append([embeddings[i].imageId, *(embeddings[m].imageId for m in members)])
+            return clusters
 
+        assigned = set()
         for item in embeddings:
             if item.imageId in assigned:
                 continue
@@ -503,16 +844,13 @@ class ProductIdentityGrouper:
                     continue
 
                 similarity: float
-                if use_multi_signal and image_metadata_map and settings:
-                    img1_meta = image_metadata_map.get(item.imageId)
-                    img2_meta = image_metadata_map.get(other.imageId)
-                    if img1_meta and img2_meta:
-                        result = await _calculate_multi_signal_similarity(img1_meta, img2_meta, settings)
-                        similarity = result.totalScore
-                    else:
-                        similarity = cosine_similarity(item.embedding, other.embedding)
+                img1_meta = image_metadata_map.get(item.imageId)
+                img2_meta = image_metadata_map.get(other.imageId)
+                if img1_meta and img2_meta:
+                    result = await _calculate_multi_signal_similarity(img1_meta, img2_meta, settings)
+                    similarity = result.totalScore
                 else:
-                    similarity = cosine_similarity(item.embedding, other.embedding)
+                    similarity = cosine_similarity_normed(item.unit_vector, other.unit_vector)
 
                 if similarity >= threshold:
                     cluster.append(other.imageId)
@@ -521,6 +859,7 @@ class ProductIdentityGrouper:
         return clusters
 
 
+    @agent_tool
     async def batch_process_with_multi_signal(
         self,
         images: List[Dict[str, Any]], # List of dicts with id, buffer, metadata, width, height
@@ -556,23 +895,23 @@ class ProductIdentityGrouper:
         image_inputs = [ImageInput(imageId=img['id'], buffer=img['buffer']) for img in images]
         
         embedding_start_time = time.time() * 1000
-        batch_result = await _generate_batch_image_embeddings(image_inputs)
+        batch_result = await self._generate_batch_image_embeddings(image_inputs)
 
         print(f'[MultiSignal] Batch embedding complete: successCount={batch_result.successCount}, failureCount={batch_result.failureCount}, totalTimeMs={batch_result.totalTimeMs:.0f}ms')
 
+        images_by_id = {img['id']: img for img in images}
         for image_id, embedding_data in batch_result.embeddings.items():
-            # Find original metadata for this image to store with embedding
-            original_image_metadata = next((img['metadata'] for img in images if img['id'] == image_id), None)
+            # Original metadata for this image to store with embedding
+            original_image_metadata = images_by_id[image_id].get('metadata')
             new_embeddings_raw.append(ProductEmbedding(
                 imageId=image_id,
                 embedding=embedding_data['embedding'],
                 metadata=original_image_metadata
             ))
-            try:
-                await self.store_embedding(image_id, embedding_data['embedding'], safe_tenant, original_image_metadata)
-            except Exception as e:
-                print(f"Failed to store embedding for {image_id}: {e}")
-        
+
+        # Stores run while existing embeddings load; new images are filtered out of those either way
+        store_task = asyncio.create_task(self.store_embeddings_batch(new_embeddings_raw, safe_tenant))
+
         for error in batch_result.errors:
             ungrouped.append(error['imageId'])
 
@@ -581,11 +920,15 @@ class ProductIdentityGrouper:
         existing_matched = 0
 
         if include_existing_embeddings:
-            existing_embeddings = await self.get_embeddings(safe_tenant)
+            existing_embeddings = await asyncio.to_thread(self._load_embeddings, safe_tenant, include_metadata=False)
             new_image_ids = {e.imageId for e in new_embeddings_raw}
             for existing in existing_embeddings:
                 if existing.imageId not in new_image_ids:
-                    all_embeddings.append(existing)
+                    all_embeddings.append(existing.to_model())
+
+        store_errors = await store_task
+        for image_id, error in store_errors.items():
+            print(f"Failed to store embedding for {image_id}: {error}")
 
         # Step 5: Cluster using multi-signal analysis
         threshold = settings.thresholds.sameProduct
@@ -599,6 +942,7 @@ class ProductIdentityGrouper:
 
         # Step 6: Create product groups with signal breakdown
         created_groups: List[ProductGroup] = []
+        batch_now_iso = time.strftime(TIMESTAMP_FORMAT, time.gmtime())
         new_image_ids_set = {e.imageId for e in new_embeddings_raw}
 
         for group_image_ids in groups:
@@ -614,35 +958,23 @@ class ProductIdentityGrouper:
                 product_group_name = f"Group of {len(group_image_ids)} images"
                 product_group_category = "General"
 
-                product_group = await self.create_product_group(group_image_ids, safe_tenant, product_name=product_group_name, category=product_group_category)
+                product_group = await self.create_product_group(group_image_ids, safe_tenant, product_name=product_group_name, category=product_group_category, now_iso=batch_now_iso)
 
                 # Calculate average similarity and signal breakdown for the group
                 if settings.enabled and len(group_image_ids) > 1:
-                    total_score = 0.0
-                    signal_sum = SignalBreakdown()
-                    comparisons = 0
-
-                    for i in range(len(group_image_ids)):
-                        for j in range(i + 1, len(group_image_ids)):
-                            img1_meta = image_metadata_map.get(group_image_ids[i])
-                            img2_meta = image_metadata_map.get(group_image_ids[j])
-
-                            if img1_meta and img2_meta:
-                                result = await _calculate_multi_signal_similarity(img1_meta, img2_meta, settings)
-                                total_score += result.totalScore
-                                signal_sum.spatial += result.signalBreakdown.spatial
-                                signal_sum.feature += result.signalBreakdown.feature
-                                signal_sum.semantic += result.signalBreakdown.semantic
-                                signal_sum.composition += result.signalBreakdown.composition
-                                signal_sum.background += result.signalBreakdown.background
-                                comparisons += 1
-                    
-                    if comparisons > 0:
-                        created_groups.append(ProductGroup(
-                            **product_group.model_dump(),
-                            confidence=total_score / comparisons # Using avg similarity as confidence
-                            # signalBreakdown is not part of ProductGroup Pydantic model
-                        ))
+                    # Score every pair with features concurrently
+                    group_metas = [image_metadata_map.get(img_id) for img_id in group_image_ids]
+                    results = await asyncio.gather(*(
+                        _calculate_multi_signal_similarity(group_metas[i], group_metas[j], settings)
+                        for i in range(len(group_metas))
+                        for j in range(i + 1, len(group_metas))
+                        if group_metas[i] and group_metas[j]
+                    ))
+
+                    if results:
+                        # Using avg similarity as confidence; signalBreakdown is not part of the ProductGroup model
+                        scores = np.fromiter((result.totalScore for result in results), dtype=np.float64, count=len(results))
+                        created_groups.append(product_group.model_copy(update={'confidence': float(scores.mean())}))
                     else:
                         created_groups.append(product_group)
                 else:
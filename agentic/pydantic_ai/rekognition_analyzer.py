@@ -1,17 +1,115 @@
 import base64
-from typing import List, Optional, Dict, Any, Tuple
+from typing import Callable, List, Optional, Dict, Any, Tuple
 import concurrent.futures
 import re
+from dataclasses import dataclass
 
-import boto3
 from pydantic import BaseModel, Field
 
+from .aws_clients import get_client
+from .tooling import agent_tool
+
+# --- Extraction Patterns ---
+# Compiled once at import; the extractors run for every analyzed image
+
+COLOR_KEYWORDS = ('Black', 'White', 'Red', 'Blue', 'Green', 'Yellow', 'Brown', 'Gray', 'Grey', 'Navy', 'Beige', 'Tan', 'Pink', 'Purple', 'Orange', 'Gold', 'Silver')
+_COLOR_SET = frozenset(COLOR_KEYWORDS)
+_NON_LETTERS_RE = re.compile(r'[^A-Za-z]+')
+
+# Category for each label, in priority order: the first label present on the image decides
+_CATEGORY_BY_LABEL = tuple(
+    (label, category)
+    for labels, category in (
+        # Clothing
+        (('dress', 'gown'), 'apparel/dress'),
+        (('jacket', 'coat', 'blazer'), 'apparel/outerwear'),
+        (('shirt', 'blouse', 'top'), 'apparel/top'),
+        (('pants', 'jeans', 'trousers'), 'apparel/bottoms'),
+        # Accessories
+        (('bag', 'purse', 'handbag'), 'accessories/bag'),
+        (('shoe', 'sneaker', 'boot'), 'accessories/footwear'),
+        (('jewelry', 'necklace', 'ring'), 'accessories/jewelry'),
+        # Clothing (generic)
+        (('clothing', 'apparel'), 'apparel/general'),
+    )
+    for label in labels
+)
+
+COMMON_BRANDS = ('ZARA', 'H&M', 'NIKE', 'ADIDAS', 'GUCCI', 'PRADA', 'LOUIS VUITTON', 'CHANEL', 'BURBERRY', 'RALPH LAUREN', 'CALVIN KLEIN', 'TOMMY HILFIGER', 'LEVI', 'GAP', 'UNIQLO', 'MANGO', 'COS')
+
+# All brands in one alternation, matched in a single scan of the text; when several appear,
+# the one listed first in COMMON_BRANDS wins, as it did with the per-brand loop.
+# Matching ignores case, so the detected text is never uppercased as a whole. Case folding is
+# ASCII-only: Unicode folding would let OCR text such as 'Levİ' or a Kelvin-sign 'K' match, and
+# the uppercased match would then not be a brand
+_BRAND_RE = re.compile(
+    '|'.join(map(re.escape, sorted(COMMON_BRANDS, key=len, reverse=True))), re.IGNORECASE | re.ASCII
+)
+_BRAND_PRIORITY = {brand: i for i, brand in enumerate(COMMON_BRANDS)}
+
+_BRAND_LINE_RE = re.compile(r'^[A-Z\s&]{2,15}$', re.IGNORECASE | re.ASCII)
+
+_SIZE_PATTERNS = (
+    r'\b(XXS|XS|S|M|L|XL|XXL|XXXL)\b',
+    # Only the size token is kept from a 'Size: XL' label
+    r'\bSize\s*:?\s*(?P<size_label>[A-Z]{1,4})\b',
+    r'\b(EU|US|UK)\s*(\d{1,2})\b',
+    r'\b(\d{1,2})\s*(EU|US|UK)\b',
+    r'\b\d{1,2}\/\d{1,2}\b',
+)
+
+_MATERIAL_PATTERNS = (
+    r'\b\d+%\s*(Cotton|Polyester|Wool|Silk|Leather|Linen|Cashmere|Denim|Nylon|Spandex|Elastane)\b',
+    r'\b(100%|Pure)\s*(Cotton|Wool|Silk|Leather|Linen|Cashmere)\b',
+)
+
+CARE_KEYWORDS = ('Machine Wash', 'Hand Wash', 'Dry Clean', 'Do Not Bleach', 'Iron', 'Tumble Dry', 'Line Dry')
+_CARE_BY_LOWER = {keyword.lower(): keyword for keyword in CARE_KEYWORDS}
+
+# Size, material and care alternatives fused into one pattern, so each detected text is scanned once
+# and `lastgroup` names the field a match belongs to
+_TEXT_FIELDS_RE = re.compile('|'.join((
+    '(?P<material>' + '|'.join(_MATERIAL_PATTERNS) + ')',
+    # Whole words only, so 'Iron' no longer fires inside 'Environment'; any run of whitespace separates words
+    r'(?P<care>\b(?:' + '|'.join(re.escape(keyword).replace(r'\ ', r'\s+') for keyword in CARE_KEYWORDS) + r')\b)',
+    '(?P<size>' + '|'.join(_SIZE_PATTERNS) + ')',
+)), re.IGNORECASE)
+
+# DetectText only feeds brand, size, material and care extraction, so it runs only when a label
+# (lowercased) suggests apparel, accessories or printed text on the image
+_TEXT_WORTHY_LABELS = frozenset({
+    'clothing', 'apparel', 'tag', 'label', 'packaging', 'text',
+    'footwear', 'shoe', 'bag', 'handbag', 'accessories',
+})
+
+# Moderation labels that reject an image when reported above the confidence limit
+INAPPROPRIATE_KEYWORDS = ('Explicit', 'Violence', 'Suggestive')
+INAPPROPRIATE_MIN_CONFIDENCE = 80
+
+# Shared by every analysis: each image costs three blocking Rekognition calls, and a long-lived pool
+# avoids starting threads per image while letting batches queue all their calls at once
+REKOGNITION_MAX_WORKERS = 16
+_REKOGNITION_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=REKOGNITION_MAX_WORKERS, thread_name_prefix='rekognition'
+)
+
 # --- Pydantic Models ---
 
-class ModerationLabel(BaseModel):
+@dataclass(slots=True)
+class ModerationLabel:
+    """
+    A moderation label as reported by Rekognition. Built for every label of every image, so it
+    is a plain dataclass rather than a model; RekognitionAnalysisResult still validates it.
+    """
     name: str
     confidence: float
 
+class RekognitionAnalysisRequest(BaseModel):
+    """One image to analyze in a batch, with the same inputs as analyze_with_rekognition."""
+    image_buffer: Optional[bytes] = None
+    bucket: Optional[str] = None
+    key: Optional[str] = None
+
 class RekognitionAnalysisResult(BaseModel):
     approved: bool
     reason: Optional[str] = None
@@ -34,108 +132,69 @@ class RekognitionAnalyzer:
     """
     Agent for analyzing images using AWS Rekognition services.
     """
-    def __init__(self, region_name: str = 'eu-west-1'):
-        self.rekognition_client = boto3.client('rekognition', region_name=region_name)
+    def __init__(self, region_name: str = 'eu-west-1', rekognition_client: Optional[Any] = None):
+        # The shared client unless one is injected; boto3 clients are thread-safe, so the pool shares it too
+        self.rekognition_client = rekognition_client or get_client('rekognition', region_name)
 
     def _extract_colors(self, labels: List[Dict[str, Any]]) -> List[str]:
-        color_keywords = ['Black', 'White', 'Red', 'Blue', 'Green', 'Yellow', 'Brown', 'Gray', 'Grey', 'Navy', 'Beige', 'Tan', 'Pink', 'Purple', 'Orange', 'Gold', 'Silver']
-        
         detected_colors = []
         for label in labels:
             name = label.get('Name')
-            if name and any(color in name for color in color_keywords):
+            # Label names are short phrases, so whole-word set lookups replace the substring scans
+            if name and not _COLOR_SET.isdisjoint(_NON_LETTERS_RE.split(name)):
                 detected_colors.append(name)
         
         return detected_colors[:3] if detected_colors else ['Various']
 
     def _map_labels_to_category(self, labels: List[Dict[str, Any]]) -> str:
-        label_names = [label.get('Name', '').lower() for label in labels]
-
-        # Clothing
-        if any(l in label_names for l in ['dress', 'gown']): return 'apparel/dress'
-        if any(l in label_names for l in ['jacket', 'coat', 'blazer']): return 'apparel/outerwear'
-        if any(l in label_names for l in ['shirt', 'blouse', 'top']): return 'apparel/top'
-        if any(l in label_names for l in ['pants', 'jeans', 'trousers']): return 'apparel/bottoms'
-
-        # Accessories
-        if any(l in label_names for l in ['bag', 'purse', 'handbag']): return 'accessories/bag'
-        if any(l in label_names for l in ['shoe', 'sneaker', 'boot']): return 'accessories/footwear'
-        if any(l in label_names for l in ['jewelry', 'necklace', 'ring']): return 'accessories/jewelry'
+        label_names = {label.get('Name', '').lower() for label in labels}
 
-        # Clothing (generic)
-        if any(l in label_names for l in ['clothing', 'apparel']): return 'apparel/general'
+        for label, category in _CATEGORY_BY_LABEL:
+            if label in label_names:
+                return category
 
         return 'general'
 
-    def _extract_brand(self, text_detections: List[Dict[str, Any]]) -> Optional[str]:
-        common_brands = ['ZARA', 'H&M', 'NIKE', 'ADIDAS', 'GUCCI', 'PRADA', 'LOUIS VUITTON', 'CHANEL', 'BURBERRY', 'RALPH LAUREN', 'CALVIN KLEIN', 'TOMMY HILFIGER', 'LEVI', 'GAP', 'UNIQLO', 'MANGO', 'COS']
-
-        for detection in text_detections:
-            text = detection.get('DetectedText', '').upper()
-            if not text:
-                continue
-
-            for brand in common_brands:
-                if brand in text:
-                    return brand
-
-            if detection.get('Type') == 'LINE' and re.match(r'^[A-Z\s&]{2,15}$', text):
-                return text.strip()
-
-        return None
-
-    def _extract_size(self, text_detections: List[Dict[str, Any]]) -> Optional[str]:
-        size_patterns = [
-            re.compile(r'\b(XXS|XS|S|M|L|XL|XXL|XXXL)\b', re.IGNORECASE),
-            re.compile(r'\bSize\s*:?\s*([A-Z]{1,4})\b', re.IGNORECASE),
-            re.compile(r'\b(EU|US|UK)\s*(\d{1,2})\b', re.IGNORECASE),
-            re.compile(r'\b(\d{1,2})\s*(EU|US|UK)\b', re.IGNORECASE),
-            re.compile(r'\b\d{1,2}\/\d{1,2}\b')
-        ]
-
-        for detection in text_detections:
-            text = detection.get('DetectedText')
-            if not text:
-                continue
-
-            for pattern in size_patterns:
-                match = pattern.search(text)
-                if match:
-                    return match.group(0).strip()
-        return None
-
-    def _extract_material(self, text_detections: List[Dict[str, Any]]) -> Optional[str]:
-        material_patterns = [
-            re.compile(r'\b\d+%\s*(Cotton|Polyester|Wool|Silk|Leather|Linen|Cashmere|Denim|Nylon|Spandex|Elastane)\b', re.IGNORECASE),
-            re.compile(r'\b(100%|Pure)\s*(Cotton|Wool|Silk|Leather|Linen|Cashmere)\b', re.IGNORECASE)
-        ]
-
-        for detection in text_detections:
-            text = detection.get('DetectedText')
-            if not text:
-                continue
-
-            for pattern in material_patterns:
-                match = pattern.search(text)
-                if match:
-                    return match.group(0).strip()
-        return None
-
-    def _extract_care_instructions(self, text_detections: List[Dict[str, Any]]) -> List[str]:
-        care_keywords = ['Machine Wash', 'Hand Wash', 'Dry Clean', 'Do Not Bleach', 'Iron', 'Tumble Dry', 'Line Dry']
+    def _extract_text_fields(
+        self, text_detections: List[Dict[str, Any]]
+    ) -> Tuple[Optional[str], Optional[str], Optional[str], List[str]]:
+        """
+        Brand, size, material and care instructions from one pass over the detected text.
+        All patterns match case-insensitively on the text as detected; only matched
+        fragments are case-folded. Brand, size and material come from the first detection
+        that has one, leftmost match first, with a 'Size: XL' label reduced to 'XL'; care
+        instructions are deduplicated in the order they were read.
+        """
+        brand: Optional[str] = None
+        size: Optional[str] = None
+        material: Optional[str] = None
         instructions = []
 
         for detection in text_detections:
             text = detection.get('DetectedText')
             if not text:
                 continue
-            
-            for keyword in care_keywords:
-                if keyword.lower() in text.lower():
-                    instructions.append(keyword)
-
-        return list(set(instructions))
 
+            if brand is None:
+                brands = _BRAND_RE.findall(text)
+                if brands:
+                    brand = min((found.upper() for found in brands), key=_BRAND_PRIORITY.__getitem__)
+                # The length bound of _BRAND_LINE_RE rejects most lines before the regex runs
+                elif detection.get('Type') == 'LINE' and 2 <= len(text) <= 15 and _BRAND_LINE_RE.match(text):
+                    brand = text.strip().upper()
+
+            for match in _TEXT_FIELDS_RE.finditer(text):
+                field = match.lastgroup
+                if field == 'care':
+                    instructions.append(_CARE_BY_LOWER[' '.join(match.group().split()).lower()])
+                elif field == 'size':
+                    size = size or (match.group('size_label') or match.group()).strip()
+                elif field == 'material':
+                    material = material or match.group().strip()
+
+        return brand, size, material, list(dict.fromkeys(instructions))
+
+    @agent_tool
     def analyze_with_rekognition(
         self,
         image_buffer: Optional[bytes] = Field(None, description="Image buffer bytes."),
@@ -143,8 +202,35 @@ class RekognitionAnalyzer:
         key: Optional[str] = Field(None, description="S3 object key if image is in S3.")
     ) -> RekognitionAnalysisResult:
         """
-        Runs AWS Rekognition APIs (DetectLabels, DetectText, DetectModerationLabels)
-        in parallel on an image.
+        Runs AWS Rekognition APIs (DetectLabels, DetectModerationLabels) in parallel on an image,
+        followed by DetectText when the labels suggest apparel, accessories or visible text.
+        """
+        return self._finish_analysis(self._start_analysis(image_buffer, bucket, key))
+
+    @agent_tool
+    def analyze_batch(self, items: List[RekognitionAnalysisRequest]) -> List[RekognitionAnalysisResult]:
+        """
+        Analyzes several images with AWS Rekognition. Every image's calls are queued on the
+        shared pool up front, so up to REKOGNITION_MAX_WORKERS calls are in flight across the batch.
+
+        Args:
+            items: The images to analyze, each given as a buffer or an S3 bucket and key.
+
+        Returns:
+            A list of RekognitionAnalysisResult objects in the same order as the items.
+        """
+        pending = [self._start_analysis(item.image_buffer, item.bucket, item.key) for item in items]
+        return [self._finish_analysis(futures) for futures in pending]
+
+    def _start_analysis(
+        self,
+        image_buffer: Optional[bytes],
+        bucket: Optional[str],
+        key: Optional[str]
+    ) -> Tuple[concurrent.futures.Future, concurrent.futures.Future]:
+        """
+        Submits the label and moderation calls for one image to the shared pool.
+        The label call submits the text call itself once it knows the text is worth reading.
         """
         if not image_buffer and not (bucket and key):
             raise ValueError("Either image_buffer or both bucket and key must be provided.")
@@ -152,11 +238,14 @@ class RekognitionAnalyzer:
         image_source = {'S3Object': {'Bucket': bucket, 'Name': key}} if bucket and key else {'Bytes': image_buffer}
 
         def detect_labels_task():
-            return self.rekognition_client.detect_labels(
+            labels_response = self.rekognition_client.detect_labels(
                 Image=image_source,
                 MaxLabels=15,
                 MinConfidence=75
             )
+            label_names = {l.get('Name', '').lower() for l in labels_response.get('Labels', [])}
+            future_text = None if _TEXT_WORTHY_LABELS.isdisjoint(label_names) else _REKOGNITION_EXECUTOR.submit(detect_text_task)
+            return labels_response, future_text
 
         def detect_text_task():
             return self.rekognition_client.detect_text(
@@ -170,52 +259,72 @@ class RekognitionAnalyzer:
                 MinConfidence=60
             )
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_labels = executor.submit(detect_labels_task)
-            future_text = executor.submit(detect_text_task)
-            future_moderation = executor.submit(detect_moderation_labels_task)
-
-            labels_response = future_labels.result()
-            text_response = future_text.result()
-            moderation_response = future_moderation.result()
+        return (
+            _REKOGNITION_EXECUTOR.submit(detect_labels_task),
+            _REKOGNITION_EXECUTOR.submit(detect_moderation_labels_task),
+        )
 
-        # Process labels
+    def _finish_analysis(
+        self,
+        futures: Tuple[concurrent.futures.Future, concurrent.futures.Future]
+    ) -> RekognitionAnalysisResult:
+        future_labels, future_moderation = futures
+        fields: Dict[str, Any] = {}
+        pending: Dict[concurrent.futures.Future, Callable[[Any], Dict[str, Any]]] = {}
+
+        def handle_labels(result: Tuple[Dict[str, Any], Optional[concurrent.futures.Future]]) -> Dict[str, Any]:
+            labels_response, future_text = result
+            if future_text is None:
+                fields.update(self._process_text({}))
+            else:
+                pending[future_text] = self._process_text
+            return self._process_labels(labels_response)
+
+        pending[future_labels] = handle_labels
+        pending[future_moderation] = self._process_moderation
+
+        # Parse each response as soon as it arrives, while the slower calls are still in flight
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                fields.update(pending.pop(future)(future.result()))
+        return RekognitionAnalysisResult(**fields)
+
+    def _process_labels(self, labels_response: Dict[str, Any]) -> Dict[str, Any]:
         labels_raw = labels_response.get('Labels', [])
-        labels = [l.get('Name') for l in labels_raw if l.get('Name')]
-        colors = self._extract_colors(labels_raw)
-        category = self._map_labels_to_category(labels_raw)
-
-        # Process text detections
+        return {
+            'labels': [l.get('Name') for l in labels_raw if l.get('Name')],
+            'colors': self._extract_colors(labels_raw),
+            'category': self._map_labels_to_category(labels_raw),
+            'rawLabels': labels_raw,
+        }
+
+    def _process_text(self, text_response: Dict[str, Any]) -> Dict[str, Any]:
         text_detections_raw = text_response.get('TextDetections', [])
-        brand = self._extract_brand(text_detections_raw)
-        size = self._extract_size(text_detections_raw)
-        material = self._extract_material(text_detections_raw)
-        care_instructions = self._extract_care_instructions(text_detections_raw)
-
-        # Process moderation
+        brand, size, material, care_instructions = self._extract_text_fields(text_detections_raw)
+        return {
+            'brand': brand,
+            'size': size,
+            'material': material,
+            'careInstructions': care_instructions,
+            'rawText': text_detections_raw,
+        }
+
+    def _process_moderation(self, moderation_response: Dict[str, Any]) -> Dict[str, Any]:
         moderation_labels_raw = moderation_response.get('ModerationLabels', [])
         moderation_labels = [
             ModerationLabel(name=l.get('Name'), confidence=l.get('Confidence'))
             for l in moderation_labels_raw if l.get('Name') and l.get('Confidence') is not None
         ]
 
-        # Check if approved (reject if high-confidence inappropriate content)
-        is_inappropriate = any(
-            l.confidence > 80 and any(keyword in l.name for keyword in ['Explicit', 'Violence', 'Suggestive'])
-            for l in moderation_labels
-        )
-
-        return RekognitionAnalysisResult(
-            approved=not is_inappropriate,
-            reason=f"Content moderation failed: {moderation_labels[0].name}" if is_inappropriate and moderation_labels else None,
-            labels=labels,
-            colors=colors,
-            category=category,
-            brand=brand,
-            size=size,
-            material=material,
-            careInstructions=care_instructions,
-            moderationLabels=moderation_labels,
-            rawLabels=labels_raw,
-            rawText=text_detections_raw
-        )
+        # Check if approved (reject if high-confidence inappropriate content); the first offending label decides
+        offending_label = next((
+            l for l in moderation_labels
+            if l.confidence > INAPPROPRIATE_MIN_CONFIDENCE and any(keyword in l.name for keyword in INAPPROPRIATE_KEYWORDS)
+        ), None)
+
+        return {
+            'approved': offending_label is None,
+            'reason': f"Content moderation failed: {offending_label.name}" if offending_label else None,
+            'moderationLabels': moderation_labels,
+        }
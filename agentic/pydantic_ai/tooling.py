@@ -0,0 +1,20 @@
+"""
+Marker for Pydantic-AI methods that agents expose as Marvin Tools.
+
+Kept free of Marvin imports so the Pydantic-AI classes stay usable on their own.
+"""
+
+from typing import Callable, TypeVar
+
+F = TypeVar('F', bound=Callable)
+
+TOOL_MARKER = '__agent_tool__'
+
+
+def agent_tool(func: F) -> F:
+    """
+    Flags a method as an agent tool. The flag is read once per class when the
+    wrapping agent builds its tool list, so no runtime reflection is needed.
+    """
+    setattr(func, TOOL_MARKER, True)
+    return func
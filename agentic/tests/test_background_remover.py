@@ -0,0 +1,58 @@
+"""
+Tests for building Nova Canvas background-removal requests.
+"""
+
+import asyncio
+import base64
+import io
+import json
+
+import pytest
+
+from agentic.pydantic_ai.background_remover import BedrockBackgroundRemover
+
+
+class _FakeBedrock:
+    def __init__(self):
+        self.bodies = []
+
+    def invoke_model(self, body, **kwargs):
+        self.bodies.append(body)
+        return {'body': io.BytesIO(json.dumps({'images': ['b3V0']}).encode())}
+
+
+@pytest.fixture
+def remover():
+    remover = BedrockBackgroundRemover()
+    remover.bedrock_client = _FakeBedrock()
+    return remover
+
+
+def test_line_wrapped_base64_is_sent_as_valid_json(remover):
+    image = base64.encodebytes(b'\x89PNG' * 40).decode('ascii')
+    assert '\n' in image
+
+    remover.remove_background(image)
+
+    body = json.loads(remover.bedrock_client.bodies[0])
+    assert body['backgroundRemovalParams']['image'] == ''.join(image.split())
+
+
+@pytest.mark.parametrize('image', [
+    'aGk="}, "taskType": "OTHER', # JSON injection
+    'aGVsbG8=é', # non-ASCII
+    'aGVsbG8', # bad length
+])
+def test_invalid_base64_is_rejected_before_the_call(remover, image):
+    with pytest.raises(ValueError, match='not valid base64'):
+        remover.remove_background(image)
+
+    assert remover.bedrock_client.bodies == []
+
+
+@pytest.mark.parametrize('concurrency', [0, -1])
+def test_batch_rejects_concurrency_below_one(remover, concurrency):
+    with pytest.raises(ValueError, match='concurrency must be at least 1'):
+        asyncio.run(remover.remove_background_batch(['aW1n'], concurrency=concurrency))
+
+    assert remover.bedrock_client.bodies == []
@@ -0,0 +1,104 @@
+"""
+Tests for batch image processing.
+"""
+
+import pytest
+
+from pydantic import ValidationError
+
+from agentic.pydantic_ai.image_processor import (
+    BedrockImageProcessor,
+    ImageProcessingOptions,
+    ProductDescription,
+    _description_from_json,
+)
+
+
+def _description(short):
+    return ProductDescription(
+        short=short, long='A long description.', category='Jackets', colors=['blue'],
+        condition='very_good', keywords=['jacket'],
+    )
+
+
+@pytest.fixture
+def processor():
+    """Processor whose Bedrock calls are replaced by canned descriptions, counting the translations."""
+    processor = BedrockImageProcessor()
+    processor.translations = 0
+
+    def translate(description):
+        processor.translations += 1
+        return _description('Jakki')
+
+    processor._invoke_vision_model_for_description = lambda image, name, media_type: _description('Jacket')
+    processor._invoke_vision_model_for_descriptions_batch = lambda items: [_description('Jacket') for _ in items]
+    processor._translate_description = translate
+    return processor
+
+
+DESCRIBE_ONLY = ImageProcessingOptions(remove_background=False, generate_description=True)
+
+
+def test_reprocessing_an_image_serves_the_cached_bilingual_description(processor):
+    first = processor.process_image_from_base64('aW1n', 'image/png', DESCRIBE_ONLY, 'Jacket')
+    second = processor.process_image_from_base64('aW1n', 'image/png', DESCRIBE_ONLY, 'Jacket')
+
+    assert processor.translations == 1
+    assert second.bilingual_description == first.bilingual_description
+    assert second.bilingual_description.is_.short == 'Jakki'
+
+
+def test_batch_reuses_descriptions_cached_by_an_earlier_batch(processor):
+    first = processor.process_images_batch(['aW1n', 'aW1n'], 'image/png', DESCRIBE_ONLY, ['Jacket', 'Coat'])
+    second = processor.process_images_batch(['aW1n', 'aW1n'], 'image/png', DESCRIBE_ONLY, ['Jacket', 'Coat'])
+
+    assert processor.translations == 2
+    assert [r.bilingual_description for r in second] == [r.bilingual_description for r in first]
+    assert all(r.bilingual_description is not None for r in second)
+
+
+@pytest.mark.parametrize('product_names', [[], ['Jacket'], ['Jacket', 'Scarf', 'Boots']])
+def test_batch_rejects_product_names_that_do_not_match_the_images(product_names):
+    processor = BedrockImageProcessor()
+    options = ImageProcessingOptions(remove_background=False, generate_description=False)
+
+    with pytest.raises(ValueError, match='product names'):
+        processor.process_images_batch(['aW1n', 'aW1n'], 'image/png', options, product_names)
+
+
+@pytest.mark.parametrize('field, value', [('short', None), ('long', 42), ('category', None)])
+def test_description_json_with_non_string_fields_is_rejected(field, value):
+    with pytest.raises(ValidationError):
+        _description_from_json({field: value}, 'Jacket')
+
+
+class _FakeTranslation:
+    """Converse client answering every translation with the given tool input."""
+
+    def __init__(self, tool_input):
+        self.tool_input = tool_input
+
+    def converse(self, **kwargs):
+        return {'output': {'message': {'content': [{'toolUse': {'input': self.tool_input}}]}}}
+
+
+def test_translated_condition_outside_the_vocabulary_keeps_the_english_one():
+    processor = BedrockImageProcessor()
+    processor._translation_client = _FakeTranslation({'short': 'Jakki', 'condition': 'mjög gott'})
+
+    translated = processor._translate_description(_description('Jacket'))
+
+    assert translated.short == 'Jakki'
+    assert translated.condition == 'very_good'
+
+
+def test_translation_with_null_fields_degrades_to_no_bilingual_description():
+    processor = BedrockImageProcessor()
+    processor._invoke_vision_model_for_description = lambda image, name, media_type: _description('Jacket')
+    processor._translation_client = _FakeTranslation({'short': None, 'long': None})
+
+    result = processor.process_image_from_base64('aW1n', 'image/png', DESCRIBE_ONLY, 'Jacket')
+
+    assert result.product_description.short == 'Jacket'
+    assert result.bilingual_description is None
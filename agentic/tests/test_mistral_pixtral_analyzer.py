@@ -0,0 +1,104 @@
+"""
+Tests for validating Mistral Pixtral Large output.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from agentic.pydantic_ai.mistral_pixtral_analyzer import (
+    MistralPixtralAnalysisResult,
+    MistralPixtralAnalyzer,
+    PixtralAnalysisRequest,
+    RekognitionHints,
+)
+
+
+def _payload(**overrides):
+    payload = {
+        "condition": "very_good",
+        "category": "coats",
+        "approved": True,
+        "short_en": "Wool coat",
+        "long_en": "A warm wool coat.",
+        "short_is": "Ullarkápa",
+        "long_is": "Hlý ullarkápa.",
+    }
+    payload.update(overrides)
+    return json.dumps(payload)
+
+
+@pytest.mark.parametrize("answer, approved", [
+    ("yes", True), ("Yes", True), (" yes ", True), ("true", True),
+    ("no", False), ("NO", False), ("false", False),
+])
+def test_yes_no_approval_is_accepted(answer, approved):
+    result = MistralPixtralAnalysisResult.model_validate_json(_payload(approved=answer))
+
+    assert result.approved is approved
+
+
+def test_numbers_sent_as_strings_are_accepted():
+    result = MistralPixtralAnalysisResult.model_validate_json(_payload(
+        aiConfidence={"condition": "0.9", "colors": "0.8", "category": 1, "overall": "0.85"},
+        pricingHints={"estimatedAgeYears": "2.5"},
+    ))
+
+    assert result.aiConfidence.condition == 0.9
+    assert result.aiConfidence.overall == 0.85
+    assert result.pricingHints.estimatedAgeYears == 2
+
+
+def test_unreadable_approval_is_rejected():
+    with pytest.raises(ValueError):
+        MistralPixtralAnalysisResult.model_validate_json(_payload(approved="maybe"))
+
+
+def _analyzer_with_shortcut():
+    analyzer = MistralPixtralAnalyzer(hints_shortcut_min_labels=2)
+    analyzer._analyze = lambda *args: pytest.fail('the model should not be called')
+    return analyzer
+
+
+def _complete_hints(**overrides):
+    hints = dict(
+        labels=['Clothing', 'Dress', 'Blue'], detectedBrand='ZARA',
+        category='apparel/dress', colors=['Blue'],
+    )
+    hints.update(overrides)
+    return RekognitionHints(**hints)
+
+
+@pytest.mark.parametrize('approved, reason', [(True, None), (False, 'Content moderation failed: Explicit Nudity')])
+def test_hints_shortcut_takes_approval_from_moderation(approved, reason):
+    result = _analyzer_with_shortcut().analyze_with_mistral_pixtral(
+        'aGk=', rekognition_hints=_complete_hints(approved=approved, moderationReason=reason)
+    )
+
+    assert result.approved is approved
+    assert result.moderationReason == reason
+    assert result.condition == 'very_good'
+    assert 'í mjög góðu ástandi' in result.long_is
+    assert 'in very good condition' in result.long_en
+
+
+def test_hints_shortcut_is_skipped_without_moderation_verdict():
+    analyzer = MistralPixtralAnalyzer(hints_shortcut_min_labels=2)
+    model_result = MistralPixtralAnalysisResult.model_validate_json(_payload(approved='no'))
+    analyzed = []
+    analyzer._analyze = lambda *args: analyzed.append(args) or model_result
+
+    result = analyzer.analyze_with_mistral_pixtral('aGk=', rekognition_hints=_complete_hints())
+
+    assert analyzed
+    assert result.approved is False
+
+
+@pytest.mark.parametrize("concurrency", [0, -1])
+def test_batch_rejects_concurrency_below_one(concurrency):
+    analyzer = MistralPixtralAnalyzer()
+    items = [PixtralAnalysisRequest(processed_image_buffer_b64="aW1n")]
+
+    with pytest.raises(ValueError, match="concurrency must be at least 1"):
+        asyncio.run(analyzer.analyze_batch_async(items, concurrency=concurrency))
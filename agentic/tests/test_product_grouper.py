@@ -0,0 +1,56 @@
+"""
+Tests for storing and loading product embeddings.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from agentic.pydantic_ai.product_grouper import ProductIdentityGrouper
+
+
+class _FakeDynamo:
+    """Keeps put items in memory and serves them back as a single query page."""
+
+    def __init__(self):
+        self.items = []
+        self.projections = []
+
+    def put_item(self, TableName, Item):
+        self.items.append(Item)
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, ProjectionExpression, ExpressionAttributeNames, **kwargs):
+        self.projections.append(ProjectionExpression)
+        referenced = set(ExpressionAttributeNames.values())
+        return [{'Items': [{k: v for k, v in item.items() if k in referenced} for item in self.items]}]
+
+
+@pytest.fixture
+def grouper():
+    grouper = ProductIdentityGrouper()
+    grouper.dynamo_client = _FakeDynamo()
+    return grouper
+
+
+def test_get_embeddings_restores_the_stored_scale(grouper):
+    raw = [3.0, 4.0, 0.0, 12.0]
+    grouper._put_embedding('img-1', raw, 'tenant')
+
+    [stored] = asyncio.run(grouper.get_embeddings('tenant'))
+
+    assert stored.imageId == 'img-1'
+    np.testing.assert_allclose(stored.embedding, raw, rtol=1e-3)
+
+
+def test_similarity_index_keeps_unit_vectors_without_reading_norm(grouper):
+    grouper._put_embedding('img-1', [3.0, 4.0], 'tenant')
+
+    ids, _, matrix = asyncio.run(grouper._get_embedding_index('tenant'))
+
+    assert list(ids) == ['img-1']
+    np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), [1.0], rtol=1e-3)
+    assert '#norm' not in grouper.dynamo_client.projections[-1]
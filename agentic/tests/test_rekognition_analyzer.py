@@ -0,0 +1,43 @@
+"""
+Tests for extracting product fields from Rekognition text detections.
+"""
+
+import pytest
+
+from agentic.pydantic_ai.rekognition_analyzer import RekognitionAnalyzer
+
+
+@pytest.fixture
+def analyzer():
+    return RekognitionAnalyzer(rekognition_client=object())
+
+
+def _lines(*texts):
+    return [{'DetectedText': text, 'Type': 'LINE'} for text in texts]
+
+
+def test_known_brand_matches_in_any_ascii_case(analyzer):
+    brand, _, _, _ = analyzer._extract_text_fields(_lines('made by Gap and zara'))
+
+    assert brand == 'ZARA'
+
+
+# 'İ' and the Kelvin sign 'K' fold to ASCII letters under Unicode IGNORECASE, but uppercasing
+# them does not give a known brand back
+@pytest.mark.parametrize('text', ['Lev\u0130 jeans 32', 'Calvin \u212alein 100% Cotton'])
+def test_unicode_case_lookalikes_are_not_brands(analyzer, text):
+    brand, _, _, _ = analyzer._extract_text_fields(_lines(text))
+
+    assert brand is None
+
+
+@pytest.mark.parametrize('text, size', [
+    ('Size: XL', 'XL'),
+    ('SIZE M 100% Cotton', 'M'),
+    ('EU 38', 'EU 38'),
+    ('32/34', '32/34'),
+])
+def test_size_keeps_only_the_size_token(analyzer, text, size):
+    _, found, _, _ = analyzer._extract_text_fields(_lines(text))
+
+    assert found == size
@@ -0,0 +1,21 @@
+"""
+Tests for turning Pydantic-AI classes into Marvin agent tools.
+"""
+
+import pytest
+
+try:
+    from marvin.tools import Tool
+
+    from agentic.background_remover_agent.agent import BackgroundRemoverAgent
+except Exception as e:  # Marvin missing or unable to initialize (e.g. no network for its tokenizer)
+    pytest.skip(f"Marvin agents unavailable: {e}", allow_module_level=True)
+
+
+def test_agent_tools_are_a_non_empty_list_of_tools():
+    agent = BackgroundRemoverAgent()
+
+    assert isinstance(agent.tools, list)
+    assert agent.tools
+    assert all(isinstance(tool, Tool) for tool in agent.tools)
+    assert {tool.name for tool in agent.tools} >= {'remove_background', 'remove_background_batch'}
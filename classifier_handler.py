@@ -13,16 +13,28 @@ import boto3
 import os
 from typing import Dict, Any, Optional
 from datetime import datetime
+from functools import lru_cache
 from botocore.auth import SigV4Auth
 from botocore.awsrequest import AWSRequest
 from botocore.credentials import Credentials
-import urllib.request
-import urllib.error
+import urllib3
 
-# AWS clients
+# AWS clients; only Rekognition is called, and every invocation calls it, so it is built during init
 rekognition = boto3.client('rekognition', region_name='eu-west-1')
-s3 = boto3.client('s3', region_name='eu-west-1')
-sts = boto3.client('sts', region_name='eu-west-1')
+
+# One session per container; its credential provider refreshes the execution role's credentials itself
+_session = boto3.Session()
+_credentials = None
+
+# Signer for the current frozen credentials, rebuilt only when the role credentials rotate
+_signer: Optional[SigV4Auth] = None
+
+# Pooled keep-alive connections to mem0, reused across warm invocations instead of a TLS handshake per POST.
+# Only connection failures are retried: a POST that reached the server may have created the memory.
+_http = urllib3.PoolManager(
+    maxsize=4,
+    retries=urllib3.Retry(total=3, connect=3, read=0, status=0, redirect=0, backoff_factor=0.2),
+)
 
 # Configuration from environment
 # Uses shared HTTP API Gateway: https://api.{stage}.carousellabs.co/mem0
@@ -129,9 +141,11 @@ def classify_image(output_key: str, tenant_id: str) -> Dict[str, Any]:
             'error': str(e)
         }
 
+@lru_cache(maxsize=1024)
 def map_to_product_category(label: str) -> str:
     """
-    Map Rekognition labels to product categories
+    Map Rekognition labels to product categories.
+    Cached per label, since Rekognition returns the same few hundred label names across images.
     """
     label_lower = label.lower()
 
@@ -151,11 +165,12 @@ def get_aws_credentials() -> Optional[Credentials]:
     """
     Get AWS credentials from the Lambda execution role
     """
+    global _credentials
     try:
-        session = boto3.Session()
-        credentials = session.get_credentials()
-        if credentials:
-            return credentials.get_frozen_credentials()
+        if _credentials is None:
+            _credentials = _session.get_credentials()
+        if _credentials:
+            return _credentials.get_frozen_credentials()
         return None
     except Exception as e:
         print(f"Failed to get AWS credentials: {str(e)}")
@@ -174,7 +189,10 @@ def sign_request(method: str, url: str, headers: Dict[str, str], body: Optional[
     request = AWSRequest(method=method, url=url, headers=headers, data=body)
 
     # Sign the request
-    SigV4Auth(credentials, 'execute-api', AWS_REGION).add_auth(request)
+    global _signer
+    if _signer is None or _signer.credentials != credentials:
+        _signer = SigV4Auth(credentials, 'execute-api', AWS_REGION)
+    _signer.add_auth(request)
 
     # Return signed headers
     return dict(request.headers)
@@ -214,32 +232,24 @@ def create_product_memory(file_hash: str, predictions: Dict[str, Any], event_det
         # Sign request with IAM credentials
         signed_headers = sign_request('POST', url, headers, body)
 
-        # Create request
-        req = urllib.request.Request(
-            url,
-            data=body,
-            headers=signed_headers,
-            method='POST'
-        )
-
-        # Execute request
-        with urllib.request.urlopen(req, timeout=10) as response:
-            response_body = response.read().decode('utf-8')
+        # Execute request on the pooled connection
+        response = _http.request('POST', url, body=body, headers=signed_headers, timeout=10.0)
+        response_body = response.data.decode('utf-8')
 
-            if response.status == 201:
-                result = json.loads(response_body)
-                print(f"Memory created successfully: {result}")
-                return result
-            else:
-                print(f"Mem0 API returned status {response.status}: {response_body}")
-                raise RuntimeError(f"Mem0 API error: status {response.status}")
+        if response.status == 201:
+            result = json.loads(response_body)
+            print(f"Memory created successfully: {result}")
+            return result
+        if response.status >= 400:
+            print(f"Mem0 API HTTP error: {response.status} - {response_body}")
+            raise RuntimeError(f"Mem0 API HTTP error: {response.status} - {response_body}")
+        print(f"Mem0 API returned status {response.status}: {response_body}")
+        raise RuntimeError(f"Mem0 API error: status {response.status}")
 
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8') if e.fp else str(e)
-        print(f"Mem0 API HTTP error: {e.code} - {error_body}")
-        raise RuntimeError(f"Mem0 API HTTP error: {e.code} - {error_body}")
+    except RuntimeError:
+        raise
 
-    except urllib.error.URLError as e:
+    except urllib3.exceptions.HTTPError as e:
         print(f"Mem0 API connection error: {str(e)}")
         raise RuntimeError(f"Mem0 API connection error: {str(e)}")
 
@@ -12,10 +12,13 @@ Usage:
 import argparse
 import json
 import logging
+import random
 import sys
-from typing import Dict, Any
+import time
+from typing import Any, Callable, Dict
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Configure logging
@@ -25,6 +28,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# botocore retries throttling and 5xx responses with client-side rate limiting
+CLIENT_CONFIG = Config(retries={'mode': 'adaptive', 'max_attempts': 10})
+
+# Create calls are retried on top of that when the service is still throttling or unavailable
+RETRYABLE_ERROR_CODES = frozenset({'ThrottlingException', 'SlowDown', 'InternalFailure', 'ServiceUnavailable'})
+CREATE_MAX_ATTEMPTS = 5
+
+
+def call_with_retries(operation: Callable[..., Any], **kwargs) -> Any:
+    """
+    Call a boto3 operation, retrying retryable errors with jittered exponential backoff
+    (capped at 15 seconds). Any other error, or the last retryable one, is raised.
+    """
+    for attempt in range(CREATE_MAX_ATTEMPTS):
+        try:
+            return operation(**kwargs)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in RETRYABLE_ERROR_CODES or attempt == CREATE_MAX_ATTEMPTS - 1:
+                raise
+            delay = min(15, 1.7 ** attempt * 0.1)
+            logger.warning(f"Retrying after {e.response['Error']['Code']} (attempt {attempt + 1}/{CREATE_MAX_ATTEMPTS})")
+            time.sleep(random.uniform(delay / 2, delay))
+
 
 def create_glue_database(glue_client, database_name: str, s3_location: str) -> bool:
     """
@@ -39,18 +65,9 @@ def create_glue_database(glue_client, database_name: str, s3_location: str) -> b
         bool: True if created or already exists, False on error
     """
     try:
-        # Check if database already exists
-        glue_client.get_database(Name=database_name)
-        logger.info(f"Database '{database_name}' already exists")
-        return True
-    except ClientError as e:
-        if e.response['Error']['Code'] != 'EntityNotFoundException':
-            logger.error(f"Error checking database: {e}")
-            return False
-
-    try:
-        # Create database
-        glue_client.create_database(
+        # Create database; an existing one is reported by the create call itself
+        call_with_retries(
+            glue_client.create_database,
             DatabaseInput={
                 'Name': database_name,
                 'Description': 'Pricing intelligence data lake for sales history analytics',
@@ -64,6 +81,9 @@ def create_glue_database(glue_client, database_name: str, s3_location: str) -> b
         logger.info(f"Created database '{database_name}' at {s3_location}")
         return True
     except ClientError as e:
+        if e.response['Error']['Code'] == 'AlreadyExistsException':
+            logger.info(f"Database '{database_name}' already exists")
+            return True
         logger.error(f"Error creating database: {e}")
         return False
 
@@ -87,17 +107,7 @@ def create_iceberg_table(
         bool: True if created or already exists, False on error
     """
     try:
-        # Check if table already exists
-        glue_client.get_table(DatabaseName=database_name, Name=table_name)
-        logger.info(f"Table '{database_name}.{table_name}' already exists")
-        return True
-    except ClientError as e:
-        if e.response['Error']['Code'] != 'EntityNotFoundException':
-            logger.error(f"Error checking table: {e}")
-            return False
-
-    try:
-        # Create Iceberg table
+        # Create Iceberg table; an existing one is reported by the create call itself
         table_input = {
             'Name': table_name,
             'TableType': 'EXTERNAL_TABLE',
@@ -112,7 +122,7 @@ def create_iceberg_table(
                     {'Name': 'sold_date', 'Type': 'timestamp', 'Comment': 'Sale completion date'},
                     {'Name': 'season', 'Type': 'string', 'Comment': 'Quarter (Q1, Q2, Q3, Q4)'},
                     {'Name': 'image_s3_key', 'Type': 'string', 'Comment': 'S3 key for product image'},
-                    {'Name': 'embedding', 'Type': 'array<double>', 'Comment': '1024-dimensional Titan embedding vector'},
+                    {'Name': 'embedding', 'Type': 'array<float>', 'Comment': '1024-dimensional Titan embedding vector'},
                     {'Name': 'description', 'Type': 'string', 'Comment': 'Product description'},
                     {'Name': 'source', 'Type': 'string', 'Comment': 'Data source (carousel)'},
                 ],
@@ -140,13 +150,17 @@ def create_iceberg_table(
             }
         }
 
-        glue_client.create_table(
+        call_with_retries(
+            glue_client.create_table,
             DatabaseName=database_name,
             TableInput=table_input
         )
         logger.info(f"Created Iceberg table '{database_name}.{table_name}' at {s3_location}")
         return True
     except ClientError as e:
+        if e.response['Error']['Code'] == 'AlreadyExistsException':
+            logger.info(f"Table '{database_name}.{table_name}' already exists")
+            return True
         logger.error(f"Error creating table: {e}")
         return False
 
@@ -168,28 +182,26 @@ def create_s3_bucket_if_needed(
         bool: True if created or already exists, False on error
     """
     try:
-        # Check if bucket exists
-        s3_client.head_bucket(Bucket=bucket_name)
-        logger.info(f"S3 bucket '{bucket_name}' already exists")
-        return True
-    except ClientError as e:
-        if e.response['Error']['Code'] != '404':
-            logger.error(f"Error checking bucket: {e}")
-            return False
-
-    try:
-        # Create bucket
-        if region == 'us-east-1':
-            s3_client.create_bucket(Bucket=bucket_name)
-        else:
-            s3_client.create_bucket(
-                Bucket=bucket_name,
-                CreateBucketConfiguration={'LocationConstraint': region}
-            )
-        logger.info(f"Created S3 bucket '{bucket_name}' in {region}")
+        # Create bucket; an existing one is reported by the create call itself
+        try:
+            if region == 'us-east-1':
+                call_with_retries(s3_client.create_bucket, Bucket=bucket_name)
+            else:
+                call_with_retries(
+                    s3_client.create_bucket,
+                    Bucket=bucket_name,
+                    CreateBucketConfiguration={'LocationConstraint': region}
+                )
+            logger.info(f"Created S3 bucket '{bucket_name}' in {region}")
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'BucketAlreadyOwnedByYou':
+                raise
+            logger.info(f"S3 bucket '{bucket_name}' already exists")
+            return True
 
         # Block public access
-        s3_client.put_public_access_block(
+        call_with_retries(
+            s3_client.put_public_access_block,
             Bucket=bucket_name,
             PublicAccessBlockConfiguration={
                 'BlockPublicAcls': True,
@@ -241,8 +253,8 @@ def main():
 
     # Initialize AWS clients
     try:
-        glue_client = boto3.client('glue', region_name=region)
-        s3_client = boto3.client('s3', region_name=region)
+        glue_client = boto3.client('glue', region_name=region, config=CLIENT_CONFIG)
+        s3_client = boto3.client('s3', region_name=region, config=CLIENT_CONFIG)
     except Exception as e:
         logger.error(f"Error initializing AWS clients: {e}")
         sys.exit(1)
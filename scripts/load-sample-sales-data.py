@@ -7,19 +7,24 @@ Iceberg table for testing analytics queries.
 
 Usage:
     python load-sample-sales-data.py --stage dev --region eu-west-1 [--num-records 1000]
+
+Uploads use the AWS Common Runtime transfer client when awscrt is installed
+(pip install 'boto3[crt]') and the standard boto3 transfer manager otherwise.
 """
 
 import argparse
-import json
 import logging
-import random
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import Dict, Tuple
 import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+import numpy as np
 import pyarrow as pa
 import pyarrow.parquet as pq
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Configure logging
@@ -29,6 +34,66 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Partitions encoded and uploaded concurrently; S3 PUTs are network-bound
+UPLOAD_WORKERS = 16
+
+# One S3 client with this configuration is shared by every upload worker (boto3 clients are
+# thread-safe). The pool leaves room for multipart parts on top of one PUT per worker, and
+# botocore retries throttled (503 SlowDown) and failed requests with client-side rate limiting
+S3_CLIENT_CONFIG = Config(
+    max_pool_connections=32,
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    tcp_keepalive=True,
+)
+
+# The CRT transfer client does TLS and multipart splitting in native code, off the GIL;
+# boto3 refuses to use it without awscrt, so fall back to the classic one then
+try:
+    import awscrt  # noqa: F401  (installed by boto3[crt])
+    PREFERRED_TRANSFER_CLIENT = 'crt'
+except ImportError:
+    PREFERRED_TRANSFER_CLIENT = 'classic'
+
+# Partitions above 8 MB go up as parallel multipart uploads
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    preferred_transfer_client=PREFERRED_TRANSFER_CLIENT,
+)
+
+
+# Titan embedding dimension
+EMBEDDING_DIM = 1024
+
+SALES_HISTORY_SCHEMA = pa.schema([
+    pa.field('product_id', pa.string()),
+    pa.field('tenant_id', pa.string()),
+    pa.field('category', pa.string()),
+    pa.field('brand', pa.string()),
+    pa.field('condition', pa.string()),
+    pa.field('sold_price', pa.decimal128(10, 2)),
+    pa.field('sold_date', pa.timestamp('us')),
+    pa.field('season', pa.string()),
+    pa.field('image_s3_key', pa.string()),
+    # Fixed-size list: imported zero-copy from the embedding matrix, written to Parquet as a plain list
+    pa.field('embedding', pa.list_(pa.float32(), EMBEDDING_DIM)),
+    pa.field('description', pa.string()),
+    pa.field('source', pa.string()),
+    pa.field('year', pa.int32()),
+    pa.field('month', pa.int32()),
+])
+
+# Parquet leaf column holding the embedding values
+EMBEDDING_PARQUET_PATH = 'embedding.list.element'
+
+# Zstd compresses the float embeddings, which dominate file size, better than Snappy; the small
+# columns stay on Snappy. Per-column codecs are keyed by Parquet leaf path, and any column
+# missing from the mapping would be written uncompressed
+PARQUET_COMPRESSION = {field.name: 'snappy' for field in SALES_HISTORY_SCHEMA if field.name != 'embedding'}
+PARQUET_COMPRESSION[EMBEDDING_PARQUET_PATH] = 'zstd'
+PARQUET_COMPRESSION_LEVEL = {EMBEDDING_PARQUET_PATH: 3}
+
 
 class SalesDataGenerator:
     """Generate realistic sample sales data."""
@@ -55,95 +120,106 @@ class SalesDataGenerator:
         """Initialize generator with desired record count."""
         self.num_records = num_records
         self.record_id = 0
-
-    def generate_records(self) -> List[Dict[str, Any]]:
-        """Generate sample sales records."""
-        records = []
-        base_date = datetime(2023, 1, 1)
-
-        for i in range(self.num_records):
-            # Distribute dates across 2 years
-            days_offset = random.randint(0, 730)
-            sold_date = base_date + timedelta(days=days_offset)
-
-            category = random.choice(self.CATEGORIES)
-            price_range = self.PRICE_RANGES.get(category, (100, 1000))
-
-            # Generate embedding (1024-dimensional vector for Titan)
-            embedding = [random.uniform(-1.0, 1.0) for _ in range(1024)]
-
-            record = {
-                'product_id': f'product-{i:06d}',
-                'tenant_id': 'carousel-labs',
-                'category': category,
-                'brand': random.choice(self.BRANDS),
-                'condition': random.choice(self.CONDITIONS),
-                'sold_price': round(random.uniform(price_range[0], price_range[1]), 2),
-                'sold_date': sold_date.isoformat(),
-                'season': self.SEASONS[(sold_date.month - 1) // 3],
-                'image_s3_key': f's3://carousel-images/product-{i:06d}/main.jpg',
-                'embedding': embedding,
-                'description': f'{category.title()} from {random.choice(self.BRANDS)}',
-                'source': 'carousel',
-                'year': sold_date.year,
-                'month': sold_date.month,
-            }
-            records.append(record)
-
-        return records
+        self.rng = np.random.default_rng()
+
+    def generate_records(self) -> Dict[str, np.ndarray]:
+        """
+        Generate sample sales records as columns (one array per field, row i across
+        all arrays is one record), ready to hand to PyArrow without a per-record dict.
+        """
+        n = self.num_records
+        rng = self.rng
+        base_date = np.datetime64('2023-01-01', 'D')
+
+        # Distribute dates across 2 years; calendar fields come from NumPy date arithmetic
+        sold_dates = base_date + rng.integers(0, 731, n).astype('timedelta64[D]')
+        years = sold_dates.astype('datetime64[Y]').astype(np.int32) + 1970
+        months = sold_dates.astype('datetime64[M]').astype(np.int32) % 12 + 1
+
+        category_idx = rng.integers(0, len(self.CATEGORIES), n)
+        categories = np.array(self.CATEGORIES)[category_idx]
+        price_ranges = np.array([self.PRICE_RANGES.get(category, (100, 1000)) for category in self.CATEGORIES])
+        prices = rng.uniform(price_ranges[category_idx, 0], price_ranges[category_idx, 1])
+
+        # The description names the record's own brand; category titles are looked up, not re-cased per row
+        brands = rng.choice(self.BRANDS, n)
+        category_titles = np.array([category.title() for category in self.CATEGORIES])[category_idx]
+
+        product_ids = np.array([f'product-{i:06d}' for i in range(n)])
+
+        return {
+            'product_id': product_ids,
+            'tenant_id': np.full(n, 'carousel-labs'),
+            'category': categories,
+            'brand': brands,
+            'condition': rng.choice(self.CONDITIONS, n),
+            'sold_price': np.round(prices, 2),
+            # Microsecond precision matches the timestamp('us') column, so Arrow takes it without conversion
+            'sold_date': sold_dates.astype('datetime64[us]'),
+            'season': np.array(self.SEASONS)[(months - 1) // 3],
+            'image_s3_key': np.char.add(np.char.add('s3://carousel-images/', product_ids), '/main.jpg'),
+            # All embeddings (1024-dimensional vectors for Titan) in one call, one row per record,
+            # uniform in [-1, 1); float32 halves the bytes and is ample for cosine similarity
+            'embedding': rng.random((n, EMBEDDING_DIM), dtype=np.float32) * 2 - 1,
+            'description': np.char.add(np.char.add(category_titles, ' from '), brands),
+            'source': np.full(n, 'carousel'),
+            'year': years,
+            'month': months,
+        }
 
     @staticmethod
-    def records_to_parquet(records: List[Dict[str, Any]]) -> bytes:
-        """Convert records to Parquet format."""
-        # Convert records to PyArrow format
-        data = {
-            'product_id': [r['product_id'] for r in records],
-            'tenant_id': [r['tenant_id'] for r in records],
-            'category': [r['category'] for r in records],
-            'brand': [r['brand'] for r in records],
-            'condition': [r['condition'] for r in records],
-            'sold_price': [r['sold_price'] for r in records],
-            'sold_date': [r['sold_date'] for r in records],
-            'season': [r['season'] for r in records],
-            'image_s3_key': [r['image_s3_key'] for r in records],
-            'embedding': [r['embedding'] for r in records],
-            'description': [r['description'] for r in records],
-            'source': [r['source'] for r in records],
-            'year': [r['year'] for r in records],
-            'month': [r['month'] for r in records],
-        }
+    def records_to_table(columns: Dict[str, np.ndarray]) -> pa.Table:
+        """Convert record columns to a single PyArrow table in the sales history schema."""
+        # PyArrow imports the NumPy columns directly; prices are rounded floats cast to decimal
+        data = dict(columns)
+        data['sold_price'] = pa.array(columns['sold_price']).cast(pa.decimal128(10, 2))
+        data['embedding'] = embeddings_to_arrow(columns['embedding'])
+        return pa.table(data, schema=SALES_HISTORY_SCHEMA)
 
-        # Create PyArrow table
-        schema = pa.schema([
-            pa.field('product_id', pa.string()),
-            pa.field('tenant_id', pa.string()),
-            pa.field('category', pa.string()),
-            pa.field('brand', pa.string()),
-            pa.field('condition', pa.string()),
-            pa.field('sold_price', pa.decimal128(10, 2)),
-            pa.field('sold_date', pa.timestamp('us')),
-            pa.field('season', pa.string()),
-            pa.field('image_s3_key', pa.string()),
-            pa.field('embedding', pa.list_(pa.float64())),
-            pa.field('description', pa.string()),
-            pa.field('source', pa.string()),
-            pa.field('year', pa.int32()),
-            pa.field('month', pa.int32()),
-        ])
-
-        table = pa.table(data, schema=schema)
-
-        # Write to Parquet in memory
+    @staticmethod
+    def records_to_parquet(table: pa.Table) -> io.BytesIO:
+        """Convert a table of records to Parquet format, returned as an in-memory file."""
+        # Write to Parquet in memory; the buffer is uploaded as-is rather than copied out
         buf = io.BytesIO()
-        pq.write_table(table, buf, compression='snappy')
-        return buf.getvalue()
+        pq.write_table(table, buf, compression=PARQUET_COMPRESSION, compression_level=PARQUET_COMPRESSION_LEVEL)
+        return buf
+
+
+def embeddings_to_arrow(values: np.ndarray) -> pa.FixedSizeListArray:
+    """
+    Build the embedding column from a contiguous (records, dimensions) matrix. Arrow wraps
+    the matrix buffer as-is, so no Python float is ever created per dimension.
+    """
+    return pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), values.shape[1])
+
+
+def partition_table(table: pa.Table) -> Dict[Tuple[int, int], pa.Table]:
+    """
+    Split a table into (year, month) partitions. The table is sorted on the partition key
+    once, so each partition is a zero-copy slice of the sorted table.
+    """
+    years = table['year'].to_numpy()
+    months = table['month'].to_numpy()
+    keys = years.astype(np.int64) * 12 + months
+    order = np.argsort(keys, kind='stable')
+    table = table.take(order)
+    boundaries = np.flatnonzero(np.diff(keys[order])) + 1
+
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(order)]))
+
+    partitions = {}
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        first = order[start]
+        partitions[(int(years[first]), int(months[first]))] = table.slice(start, end - start)
+    return partitions
 
 
 def upload_to_s3(
     s3_client,
     bucket: str,
     key: str,
-    data: bytes,
+    data: io.BytesIO,
     partition_year: int,
     partition_month: int
 ) -> bool:
@@ -152,24 +228,49 @@ def upload_to_s3(
         # Use Iceberg partition naming convention
         partition_key = f'pricing-intelligence/sales_history/year={partition_year}/month={partition_month}/{key}'
 
-        s3_client.put_object(
-            Bucket=bucket,
-            Key=partition_key,
-            Body=data,
-            ContentType='application/octet-stream',
-            Metadata={
-                'table': 'sales_history',
-                'format': 'parquet',
-                'compression': 'snappy',
-            }
+        size = data.getbuffer().nbytes
+        data.seek(0)
+        s3_client.upload_fileobj(
+            data,
+            bucket,
+            partition_key,
+            ExtraArgs={
+                'ContentType': 'application/octet-stream',
+                'Metadata': {
+                    'table': 'sales_history',
+                    'format': 'parquet',
+                    'compression': 'snappy,zstd',
+                },
+            },
+            Config=TRANSFER_CONFIG,
         )
-        logger.info(f"Uploaded {len(data)} bytes to s3://{bucket}/{partition_key}")
+        logger.info(f"Uploaded {size} bytes to s3://{bucket}/{partition_key}")
         return True
-    except ClientError as e:
+    except (ClientError, S3UploadFailedError) as e:
+        # upload_fileobj wraps failed transfers in S3UploadFailedError rather than raising ClientError
         logger.error(f"Error uploading to S3: {e}")
         return False
 
 
+def encode_and_upload(
+    s3_client,
+    bucket: str,
+    stage: str,
+    index: int,
+    partition_year: int,
+    partition_month: int,
+    partition: pa.Table
+) -> bool:
+    """Convert one partition to Parquet and upload it."""
+    logger.info(f"Converting {partition.num_rows} records to Parquet (Y={partition_year}, M={partition_month})...")
+    parquet_data = SalesDataGenerator.records_to_parquet(partition)
+
+    # Generate filename
+    filename = f'{stage}-sales-{partition_year}-{partition_month:02d}-{index:06d}.parquet'
+
+    return upload_to_s3(s3_client, bucket, filename, parquet_data, partition_year, partition_month)
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -205,48 +306,42 @@ def main():
 
     # Generate sample data
     generator = SalesDataGenerator(num_records=num_records)
-    records = generator.generate_records()
+    columns = generator.generate_records()
 
-    logger.info(f"Generated {len(records)} records")
+    logger.info(f"Generated {len(columns['product_id'])} records")
 
-    # Group records by year/month for efficient Iceberg partition writing
-    partitions: Dict[tuple, List[Dict[str, Any]]] = {}
-    for record in records:
-        key = (record['year'], record['month'])
-        if key not in partitions:
-            partitions[key] = []
-        partitions[key].append(record)
+    # Convert once, then group records by year/month for efficient Iceberg partition writing
+    table = SalesDataGenerator.records_to_table(columns)
+    partitions = partition_table(table)
 
     logger.info(f"Records grouped into {len(partitions)} partitions")
 
     # Initialize S3 client
     try:
-        s3_client = boto3.client('s3', region_name=region)
+        s3_client = boto3.client('s3', region_name=region, config=S3_CLIENT_CONFIG)
     except Exception as e:
         logger.error(f"Error initializing S3 client: {e}")
         return 1
 
-    # Upload each partition
+    # Upload all partitions concurrently
     uploaded_count = 0
-    for (year, month), partition_records in sorted(partitions.items()):
-        logger.info(f"Converting {len(partition_records)} records to Parquet (Y={year}, M={month})...")
-
-        try:
-            parquet_data = SalesDataGenerator.records_to_parquet(partition_records)
-
-            # Generate filename
-            filename = f'{stage}-sales-{year}-{month:02d}-{uploaded_count:06d}.parquet'
-
-            if upload_to_s3(s3_client, bucket, filename, parquet_data, year, month):
-                uploaded_count += 1
-            else:
-                logger.warning(f"Failed to upload partition Y={year}, M={month}")
-        except Exception as e:
-            logger.error(f"Error processing partition Y={year}, M={month}: {e}")
-            continue
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        futures = {
+            executor.submit(encode_and_upload, s3_client, bucket, stage, index, year, month, partition): (year, month)
+            for index, ((year, month), partition) in enumerate(sorted(partitions.items()))
+        }
+        for future in as_completed(futures):
+            year, month = futures[future]
+            try:
+                if future.result():
+                    uploaded_count += 1
+                else:
+                    logger.warning(f"Failed to upload partition Y={year}, M={month}")
+            except Exception as e:
+                logger.error(f"Error processing partition Y={year}, M={month}: {e}")
 
     logger.info(f"Successfully uploaded {uploaded_count} Parquet files")
-    logger.info(f"Total records loaded: {sum(len(v) for v in partitions.values())}")
+    logger.info(f"Total records loaded: {table.num_rows}")
     logger.info("")
     logger.info("Sample query to verify data:")
     logger.info(f"SELECT * FROM pricing_intelligence_{stage}.sales_history LIMIT 10")
@@ -207,6 +207,33 @@ export function classifySimilarity(similarity: number): SimilarityMatch['matchTy
   return 'DIFFERENT';
 }
 
+/**
+ * Decode a stored embedding. The Python grouper writes little-endian float16 bytes
+ * (a DynamoDB Binary attribute); items written here hold a JSON string.
+ */
+function decodeEmbedding(value: string | Uint8Array): number[] {
+  if (typeof value === 'string') {
+    return JSON.parse(value);
+  }
+  if (value.byteLength % 2 !== 0) {
+    throw new Error(`Invalid float16 embedding: ${value.byteLength} bytes`);
+  }
+  const view = new DataView(value.buffer, value.byteOffset, value.byteLength);
+  const embedding = new Array<number>(value.byteLength / 2);
+  for (let i = 0; i < embedding.length; i++) {
+    const half = view.getUint16(i * 2, true);
+    const sign = half & 0x8000 ? -1 : 1;
+    const exponent = (half >> 10) & 0x1f;
+    const fraction = half & 0x3ff;
+    embedding[i] = exponent === 0
+      ? sign * fraction * 2 ** -24
+      : exponent === 0x1f
+        ? (fraction ? NaN : sign * Infinity)
+        : sign * (1 + fraction / 1024) * 2 ** (exponent - 15);
+  }
+  return embedding;
+}
+
 /**
  * Store embedding in DynamoDB
  * BUG #15 FIX: Sanitize tenant input
@@ -268,7 +295,7 @@ export async function getEmbeddings(
       try {
         embeddings.push({
           imageId: data.imageId,
-          embedding: JSON.parse(data.embedding),
+          embedding: decodeEmbedding(data.embedding),
           productGroupId: data.productGroupId,
           metadata: data.metadata,
         });